@@ -14,6 +14,8 @@
 
 import argparse
 from clientparser import ClientParser
+from clientparser.profiling import CycleProfiler
+from clientparser.scheduler import Scheduler
 
 
 def main() -> None:
@@ -22,13 +24,20 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Client Parser")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose mode")
     parser.add_argument("-i", "--interval", type=int, default=0, help="Set the interval in seconds. If the value is 0, the application will run once and exit")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Collect the data with the asyncio engine instead of threads")
+    parser.add_argument("--overrun", choices=Scheduler.policies, default="skip", help="What to do when a cycle runs past the next interval boundary: skip the missed runs or catch up")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port, overrides METRICS_PORT")
+    parser.add_argument("--profile", choices=CycleProfiler.modes, default=None, help="Profile the cycles with cProfile (cpu) or tracemalloc (memory)")
+    parser.add_argument("--profile-every", type=int, default=1, help="Profile every Nth cycle in interval mode")
+    parser.add_argument("--profile-dir", default="profiles", help="Directory of the .prof/.json profiling results")
     args = parser.parse_args()
 
     # Create the client parser instance
-    client_parser = ClientParser()
+    profiler = CycleProfiler(mode=args.profile, every=args.profile_every, output_dir=args.profile_dir)
+    client_parser = ClientParser(metrics_port=args.metrics_port, profiler=profiler)
 
     # Run the client parser with the specified arguments
-    client_parser.run(verbose=args.verbose, interval=args.interval)
+    client_parser.run(verbose=args.verbose, interval=args.interval, use_async=args.use_async, overrun=args.overrun)
 
 
 if __name__ == "__main__":
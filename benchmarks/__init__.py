@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: benchmarks/__init__.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This package includes the end-to-end benchmarks of a full collection cycle,
+# using the synthetic command runner and an SQLite or MariaDB database.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from typing import Dict, List, NamedTuple
+
+__all__ = ["BenchmarkCase", "CASES"]
+
+
+class BenchmarkCase(NamedTuple):
+    """The size of a benchmarked collection cycle."""
+    # The DHCP scopes and the number of leases per scope
+    scopes: List[str]
+    leases_per_scope: int
+    # The reverse lookup zones and the number of records per DNS zone, the forward lookup zone included
+    reverse_zones: List[str]
+    records_per_zone: int
+
+    @property
+    def leases(self) -> int:
+        return len(self.scopes) * self.leases_per_scope
+
+    @property
+    def records(self) -> int:
+        return (len(self.reverse_zones) + 1) * self.records_per_zone
+
+
+_SCOPES = ["10.0.1.0", "10.0.2.0", "10.0.3.0", "10.0.4.0"]
+
+CASES: Dict[str, BenchmarkCase] = {
+    "1k": BenchmarkCase(_SCOPES, 250, ["1.0.10.in-addr.arpa"], 5_000),
+    "10k": BenchmarkCase(_SCOPES, 2_500, ["1.0.10.in-addr.arpa"], 10_000),
+    "100k": BenchmarkCase(_SCOPES, 25_000, ["1.0.10.in-addr.arpa", "2.0.10.in-addr.arpa"], 50_000),
+    "1m": BenchmarkCase(_SCOPES, 250_000, ["1.0.10.in-addr.arpa", "2.0.10.in-addr.arpa", "3.0.10.in-addr.arpa", "4.0.10.in-addr.arpa"], 100_000),
+}
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: benchmarks/__main__.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This is the entry point of the benchmark suite. Every case runs in its own
+# process, first with the phases timed separately and then end-to-end, and the
+# results are written as JSON so they can be compared between releases.
+#
+# Usage: python -m benchmarks --cases 1k 10k --output results.json
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks import BenchmarkCase, CASES
+
+
+# The repository root, the benchmark processes are started from there
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _case_environment(case: BenchmarkCase, database_uri: str, json_lines: bool) -> Dict[str, str]:
+    """The environment variables that configure the application for a benchmark case."""
+    return {
+        **os.environ,
+        "SCOPES": f"[{', '.join(case.scopes)}]",
+        "DHCP_SERVER": "dhcp.example.local",
+        "DNS_SERVER": "dns.example.local",
+        "DNS_ZONE": "example.local",
+        "DNS_REVERSE_ZONES": f"[{', '.join(case.reverse_zones)}]",
+        "DATABASE_URI": database_uri,
+        "SYNC_MODE": "full",
+        "DNS_JSON_LINES": str(json_lines).lower(),
+        "COMMAND_RUNNER": "synthetic",
+        "SYNTHETIC_LEASES": str(case.leases_per_scope),
+        "SYNTHETIC_RECORDS": str(case.records_per_zone),
+    }
+
+
+def _run_benchmark(mode: str, environment: Dict[str, str], repeat: int, use_tracemalloc: bool) -> Dict[str, Any]:
+    """Run a benchmark in a new process and return its results."""
+    command = [sys.executable, "-m", "benchmarks.cycle", "--mode", mode, "--repeat", str(repeat)]
+    if use_tracemalloc:
+        command.append("--tracemalloc")
+
+    result = subprocess.run(command, cwd=ROOT_DIR, env=environment, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"The {mode} benchmark failed: {result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _run_case(name: str, case: BenchmarkCase, database_uri: Optional[str], repeat: int, json_lines: bool, use_tracemalloc: bool) -> Dict[str, Any]:
+    """Run the phases and the end-to-end benchmarks of a case, on a new SQLite database unless a database is given."""
+    with tempfile.TemporaryDirectory(prefix="clientparser-benchmark-") as temp_dir:
+        environment = _case_environment(case, database_uri or f"sqlite:///{Path(temp_dir) / 'benchmark.sqlite'}", json_lines)
+        return {
+            "case": name,
+            "leases": case.leases,
+            "records": case.records,
+            "phases": _run_benchmark("phases", environment, repeat, use_tracemalloc),
+            "cycle": _run_benchmark("cycle", environment, repeat, use_tracemalloc),
+        }
+
+
+def _print_summary(result: Dict[str, Any]) -> None:
+    """Print a short summary of the results of a case."""
+    phases = result["phases"]["runs"][-1]["phases"]
+    cycle = result["cycle"]["runs"][-1]
+    print(
+        f"{result['case']:>5}: {cycle['rows']} rows in {cycle['seconds']:.2f}s ({cycle['rows_per_second']:.0f} rows/s), "
+        + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in phases.items())
+        + f", peak RSS {result['cycle']['peak_rss_kb']} kB",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    """Run the benchmark cases and write the results as JSON."""
+    parser = argparse.ArgumentParser(description="Client Parser benchmarks")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=["1k", "10k"], help="The benchmark cases to run")
+    parser.add_argument("--database-uri", default=None, help="Run against this database, e.g. a local MariaDB, instead of a new SQLite database per case")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of cycles per benchmark")
+    parser.add_argument("--document", action="store_true", help="Print the DNS records as a single JSON document instead of JSON-lines")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the peak memory allocated by Python")
+    parser.add_argument("-o", "--output", default=None, help="Write the results to this file instead of the standard output")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for name in args.cases:
+        result = _run_case(name, CASES[name], args.database_uri, args.repeat, not args.document, args.tracemalloc)
+        _print_summary(result)
+        results.append(result)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "sqlite" if args.database_uri is None else args.database_uri.split(":", 1)[0],
+        "results": results,
+    }
+
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: benchmarks/cycle.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module runs a single benchmark in its own process and prints the results
+# as JSON. The case is configured through the same environment variables as the
+# application, so the benchmark driver can set them before the config is loaded.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import Table, func, select
+
+from clientparser import ClientParser, database
+from clientparser.runners import Command
+from clientparser.parsers import LEASE_COLUMNS, iter_leases, iter_dns_records, forward_record_to_row, reverse_record_to_row
+from clientparser.database import get_dhcp_table, get_final_table, DNSModel
+from clientparser.sync import DHCP_KEY, DNS_KEY
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, the peak memory is then only reported with --tracemalloc
+    resource = None
+
+__all__ = ["run_phases", "run_cycle", "peak_rss_kb"]
+
+
+# A source of the cycle: its name, command, table, row parser, key columns, writer mode and filters
+Source = Tuple[str, Command, Table, Callable[[Iterable[str]], Iterator[Dict[str, Any]]], Tuple[str, ...], str, Optional[Dict[str, Any]]]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """The peak resident set size of the process in kilobytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _count_rows() -> int:
+    """Count the rows of the final DHCP and DNS tables."""
+    tables = [get_final_table(get_dhcp_table(scope)) for scope in ClientParser.config.scopes] + [get_final_table(DNSModel.__table__)]
+    with database.db_engine.connect() as connection:
+        return sum(connection.execute(select(func.count()).select_from(table)).scalar_one() for table in tables)
+
+
+def _sources(client_parser: ClientParser) -> List[Source]:
+    """The commands of a collection cycle, with everything needed to parse and store their output."""
+    config = client_parser.config
+    timestamp = datetime.now()
+    sources: List[Source] = []
+
+    for scope in config.scopes:
+        def parse_dhcp(lines: Iterable[str], scope: str = scope) -> Iterator[Dict[str, Any]]:
+            return (dict(zip(LEASE_COLUMNS, lease)) for lease in iter_leases(lines, scope))
+        sources.append((scope, client_parser._dhcp_command(scope), get_dhcp_table(scope), parse_dhcp, DHCP_KEY, "executemany", None))
+
+    def parse_forward(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        return (forward_record_to_row(record, timestamp) for record in iter_dns_records(lines, json_lines=config.dns_json_lines))
+    sources.append((config.dns_zone, client_parser._dns_forward_command(), DNSModel.__table__, parse_forward, DNS_KEY, client_parser._dns_writer_mode, {"name": config.dns_zone}))
+
+    for zone in config.dns_reverse_zones:
+        def parse_reverse(lines: Iterable[str], zone: str = zone) -> Iterator[Dict[str, Any]]:
+            return (reverse_record_to_row(record, zone, config.dns_zone, timestamp) for record in iter_dns_records(lines, json_lines=config.dns_json_lines))
+        sources.append((zone, client_parser._dns_reverse_command(zone), DNSModel.__table__, parse_reverse, DNS_KEY, client_parser._dns_writer_mode, {"name": zone}))
+
+    return sources
+
+
+def run_phases(client_parser: ClientParser) -> Dict[str, Any]:
+    """
+    Run a collection cycle one source after the other and time every phase separately.
+    The rows of each source are parsed into memory before they are stored, so the
+    parse and insert phases do not overlap like they do in the real cycle.
+    """
+    phases = {"prepare": 0.0, "spawn": 0.0, "parse": 0.0, "insert": 0.0, "finalize": 0.0}
+    rows_count = 0
+
+    start_time = time.perf_counter()
+    client_parser._prepare_tables()
+    phases["prepare"] = time.perf_counter() - start_time
+
+    for source, command, table, parse, key_columns, mode, filters in _sources(client_parser):
+        # Spawn the command and wait for its first line
+        start_time = time.perf_counter()
+        with client_parser.runner.stream(command) as lines:
+            first_lines = [line for line in [next(lines, None)] if line is not None]
+            phases["spawn"] += time.perf_counter() - start_time
+
+            # Read and parse the rest of the output
+            start_time = time.perf_counter()
+            rows = list(parse(chain(first_lines, lines)))
+            phases["parse"] += time.perf_counter() - start_time
+
+        # Write the rows to the temp table
+        start_time = time.perf_counter()
+        client_parser._store_rows(source, table, rows, key_columns, mode, filters)
+        phases["insert"] += time.perf_counter() - start_time
+        rows_count += len(rows)
+
+    # Swap the tables, waiting for the old tables to be dropped
+    start_time = time.perf_counter()
+    if not client_parser._incremental:
+        client_parser._finalize_tables()
+        if client_parser._cleanup_thread is not None:
+            client_parser._cleanup_thread.join()
+    phases["finalize"] = time.perf_counter() - start_time
+
+    return {
+        "rows": rows_count,
+        "phases": phases,
+        "seconds": sum(phases.values()),
+        "rows_per_second": {
+            "parse": rows_count / phases["parse"] if phases["parse"] else None,
+            "insert": rows_count / phases["insert"] if phases["insert"] else None,
+        },
+    }
+
+
+def run_cycle(client_parser: ClientParser) -> Dict[str, Any]:
+    """Run a full collection cycle with ClientParser._get_data and time it end-to-end."""
+    start_time = time.perf_counter()
+    client_parser._get_data(verbose=False)
+    if client_parser._cleanup_thread is not None:
+        client_parser._cleanup_thread.join()
+    seconds = time.perf_counter() - start_time
+
+    rows_count = _count_rows()
+    return {"rows": rows_count, "seconds": seconds, "rows_per_second": rows_count / seconds if seconds else None}
+
+
+def main() -> None:
+    """Run one benchmark of the case configured in the environment and print the results as JSON."""
+    parser = argparse.ArgumentParser(description="Client Parser benchmark cycle")
+    parser.add_argument("--mode", choices=("phases", "cycle"), default="cycle", help="Time every phase separately or the full cycle end-to-end")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of cycles to run, the results of every cycle are reported")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the peak memory allocated by Python, slows the benchmark down")
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    client_parser = ClientParser()
+    benchmark = run_phases if args.mode == "phases" else run_cycle
+    try:
+        runs = [benchmark(client_parser) for _ in range(args.repeat)]
+    finally:
+        client_parser._executor.shutdown(wait=True)
+        client_parser.runner.close()
+        database.dispose_db()
+
+    results = {"mode": args.mode, "runs": runs, "peak_rss_kb": peak_rss_kb()}
+    if args.tracemalloc:
+        results["tracemalloc_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
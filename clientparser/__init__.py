@@ -12,297 +12,637 @@
 # Copyright (C) 2025 NSF SEES, USA
 # ----------------------------------------------------------------------------------
 
-import subprocess
-import re
-import time
-import json
-from datetime import datetime, timedelta
+import asyncio
+import math
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import Table
 
 from clientparser.config import Config
-from clientparser.database import initialize_and_create_tables, session_scope, DHCPModel, DNSModel, DBException, drop_and_rename_table
-from concurrent.futures import ThreadPoolExecutor
+from clientparser.dispatcher import ServerDispatcher
+from clientparser.metrics import Instrumentation, create_instrumentation
+from clientparser.parsers import LEASE_COLUMNS, lease_parser, iter_leases, dns_record_parser, iter_dns_records, forward_record_to_row, reverse_record_to_row
+from clientparser.profiling import CycleProfiler
+from clientparser.scheduler import Scheduler
+from clientparser.powershell import DNS_RECORDS_SCRIPT, build_script
+from clientparser.runners import Command, CommandRunner, create_runner
+from clientparser.database import (
+    initialize_and_create_tables, create_temp_tables, batch_writer, AsyncBatchWriter, get_dhcp_table, get_final_table, tables_exist, fetch_rows, copy_rows,
+    apply_changes, deduplicate_rows, build_indexes,
+    DNSModel, swap_tables, pool_status, dispose_db,
+)
+from clientparser.history import get_history_table, create_history_tables, write_history, rotate_history_partitions
+from clientparser.sync import DHCP_KEY, DNS_KEY, Delta, build_snapshot, iter_snapshot, diff_snapshots
+from concurrent.futures import Future, ThreadPoolExecutor
 
 
-__all__ = ["ClientParser"]
+__all__ = ["ClientParser", "COLLECTORS"]
+
+
+# The collectors that can run on their own interval
+COLLECTORS = ("dhcp", "dns_forward", "dns_reverse")
 
 
 class ClientParser:
 
     config = Config()
 
-    def _get_dhcp_data(self, verbose: bool) -> None:
-        """Get the DHCP data and save it to the database and/or an output file."""
-        
-        # Run DHCP commands for all scopes concurrently
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for scope in self.config.scopes:
-                # Define the netsh command
-                netsh_command = f"netsh dhcp server \\\\{self.config.dhcp_server} scope {scope} show clients 1"
-                # Submit the command to the executor
-                futures.append(executor.submit(subprocess.run, netsh_command, shell=True, capture_output=True, text=True))
-
-            for future, scope in zip(futures, self.config.scopes):
-                try:
-                    current_scope = future.result()
-                    if verbose:
-                        print(f"Processing DHCP scope: {scope}")
-                    # Filter the DHCP export command
-                    for lease in current_scope.stdout.splitlines():
-                        if lease.startswith("1"):
-                            # Split the lease into parts
-                            lease_parts = re.split(r"-(N|U|D)-", lease, maxsplit=1)
-
-                            if len(lease_parts) > 1:
-                                small_lease_parts = lease_parts[0].split("-")
-
-                                # Get the IP address, MAC address, lease status, hostname, and timestamp
-                                ip_address = small_lease_parts[0].strip()
-                                mac_address = ":".join(part.strip().upper() for part in small_lease_parts[2:-1])
-
-                                # Check if the MAC address is longer than the normal length (17 characters)
-                                if len(mac_address) > 17:
-                                    mac_address = mac_address + ":XX"
-
-                                lease_status = small_lease_parts[-1].strip()
-                                hostname = lease_parts[2].strip().split(".")[0].lower()
-                                subnet = scope.split()[0]
-                                timestamp = datetime.now()
-
-                                                                # Get the model class based on the scope
-                                model_class = next((model for model in DHCPModel.create_dhcp_models([scope]) if model.scope == scope), None,)
-
-                                # Create a new entry
-                                if model_class:
-                                    new_entry = model_class(
-                                        ip=ip_address,
-                                        mac_address=mac_address,
-                                        lease_status=lease_status,
-                                        hostname=hostname,
-                                        subnet=subnet,
-                                        timestamp=timestamp,
-                                    )
-
-                                    # Add the new entry to the database
-                                    with session_scope() as session:
-                                        try:
-                                            session.add(new_entry)
-                                        except Exception as e:
-                                            raise DBException(f"Error adding {ip_address} to the database: {e}")
-                except Exception as e:
-                    raise RuntimeError(f"Error processing scope {scope}: {e}")
+    def __init__(
+        self,
+        runner: Optional[CommandRunner] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        metrics_port: Optional[int] = None,
+        profiler: Optional[CycleProfiler] = None,
+    ) -> None:
+        # The runner that provides the output of the netsh and PowerShell commands
+        self.runner = runner or create_runner(self.config)
+        # The timers and counters of the collection cycles, and the metrics endpoint if a port is set
+        self.instrumentation = instrumentation or create_instrumentation(self.config, metrics_port=metrics_port, pool_status=pool_status)
+        # The cProfile/tracemalloc profiler of the cycles, disabled by default
+        self.profiler = profiler or CycleProfiler()
+        # The scheduler of the interval mode, created when the application loop starts
+        self._scheduler: Optional[Scheduler] = None
+        # The scheduler boundary of the last run of every collector
+        self._last_runs: Dict[str, float] = {}
+
+        # Whether the current cycle only writes the changes to the final tables
+        self._incremental = False
+        # The rows that were last written to the final tables, keyed by DHCP scope or DNS zone
+        self._snapshots: Dict[str, Dict[Tuple[Any, ...], Dict[str, Any]]] = {}
+        # The changes and snapshots of a full cycle, kept until its tables are swapped
+        self._pending_history: List[Tuple[str, Table, Delta, Dict[Tuple[Any, ...], Dict[str, Any]]]] = []
+        # The day the history tables were last rotated
+        self._history_day: Optional[date] = None
+        # The background thread that drops the old tables after the last swap
+        self._cleanup_thread: Optional[threading.Thread] = None
+
+        # Shared executor for all collectors, with a limit of concurrent commands per server
+        self._executor = ThreadPoolExecutor(max_workers=self.config.max_collector_workers, thread_name_prefix="collector")
+        self._dhcp_dispatcher = ServerDispatcher(self._executor, self.config.dhcp_server_concurrency)
+        self._dns_dispatcher = ServerDispatcher(self._executor, self.config.dns_server_concurrency)
+
+    def _submit(self, dispatcher: ServerDispatcher, function: Callable[..., None], *args: Any) -> Future:
+        """Submit a collection task through the dispatcher of its server, it takes an executor thread once the server limit allows it."""
+        def task() -> None:
+            with self.profiler.task():
+                function(*args)
+        return dispatcher.submit(task)
+
+    @property
+    def _dns_writer_mode(self) -> str:
+        """The batch writer mode used for the DNS records."""
+        return "infile" if self.config.dns_load_data_infile else "multirow"
+
+    def _rejected(self, source: str) -> Callable[[str], None]:
+        """A callback that counts the output lines of a DHCP scope or DNS zone that could not be parsed."""
+        return lambda line: self.instrumentation.count("rows_rejected", source=source)
+
+    def _server(self, command: Command) -> str:
+        """The DHCP or DNS server queried by a command."""
+        return self.config.dhcp_server if command.kind == "dhcp" else self.config.dns_server
+
+    @contextmanager
+    def _stream(self, source: str, command: Command) -> Iterator[Iterator[str]]:
+        """
+        Run the command of a DHCP scope or DNS zone and time it. The collect timer only
+        counts the time spent in the runner, the time spent waiting for the output is
+        also timed as a phase of its own.
+        """
+        server = self._server(command)
+        with self.instrumentation.phase("command", source=source, server=server), self.instrumentation.stream_timer(self.runner.stream(command), "collect", source=source, server=server) as lines:
+            yield self.instrumentation.iter_phase(lines, "read", source=source)
+
+    @asynccontextmanager
+    async def _astream(self, source: str, command: Command) -> AsyncIterator[AsyncIterator[str]]:
+        """Run the command of a DHCP scope or DNS zone with the asyncio engine and time it."""
+        async with self.instrumentation.astream_timer(self.runner.astream(command), "collect", source=source, server=self._server(command)) as lines:
+            yield lines
+
+    @property
+    def _tracks_changes(self) -> bool:
+        """Whether the changes of every source are computed, for the incremental mode or the history."""
+        return self._incremental or self.config.history_enabled
+
+    def _store_rows(self, source: str, table: Table, rows: Iterable[Dict[str, Any]], key_columns: Tuple[str, ...], mode: str = "executemany", filters: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store the rows of a DHCP scope or DNS zone. In full mode they are written to
+        the temp table, in incremental mode only the changes since the last cycle are
+        applied to the final table. The changes are added to the history if it is enabled.
+        """
+        rows = self.instrumentation.iter_phase(rows, "parse", counter="rows_parsed", source=source)
+
+        if not self._incremental:
+            # The snapshot of the history is built while the rows are streamed to the temp table
+            current = {}
+            if self.config.history_enabled:
+                rows = iter_snapshot(rows, key_columns, current)
+            with self.instrumentation.phase("insert", source=source), batch_writer(table, mode=mode, fast_load=self.config.fast_load) as writer:
+                writer.add_all(rows)
+            self.instrumentation.count("rows_inserted", writer.rows_written, source=source)
+
+            # The history is written once the temp tables replaced the final tables
+            if self.config.history_enabled:
+                self._pending_history.append((source, table, self._diff(source, get_final_table(table), current, key_columns, filters), current))
+            return
+
+        final_table = get_final_table(table)
+        current = build_snapshot(rows, key_columns)
+        delta = self._diff(source, final_table, current, key_columns, filters)
+
+        if delta:
+            with self.instrumentation.phase("insert", source=source):
+                apply_changes(final_table, *delta, key_columns=key_columns, filters=filters)
+        self.instrumentation.count("rows_inserted", len(delta.inserts), source=source)
+        self.instrumentation.count("rows_updated", len(delta.updates), source=source)
+        self.instrumentation.count("rows_deleted", len(delta.deletes), source=source)
+        if self.config.history_enabled:
+            self._write_history(source, table, delta)
+        self._snapshots[source] = current
+
+    def _diff(self, source: str, final_table: Table, current: Dict[Tuple[Any, ...], Dict[str, Any]], key_columns: Tuple[str, ...], filters: Optional[Dict[str, Any]] = None) -> Delta:
+        """Compute the changes of a source since the last cycle, the first cycle compares with the final table if it exists."""
+        with self.instrumentation.phase("diff", source=source):
+            previous = self._snapshots.get(source)
+            if previous is None:
+                previous = build_snapshot(fetch_rows(final_table, filters), key_columns) if tables_exist([final_table]) else {}
+            return diff_snapshots(previous, current)
+
+    def _write_history(self, source: str, table: Table, delta: Delta) -> None:
+        """Append the changes of a source to its history table."""
+        if not delta:
+            return
+        with self.instrumentation.phase("history", source=source):
+            rows_written = write_history(get_history_table(table), delta, datetime.now())
+        self.instrumentation.count("history_rows", rows_written, source=source)
+
+    def _dhcp_command(self, scope: str) -> Command:
+        """The netsh command that prints the leases of a DHCP scope."""
+        return Command(kind="dhcp", targets=(scope,), args=["netsh", "dhcp", "server", f"\\\\{self.config.dhcp_server}", "scope", scope, "show", "clients", "1"])
+
+    def _powershell_command(self, kind: str, zones: List[str], script: str) -> Command:
+        """The command that runs a PowerShell script for the given DNS zones."""
+        return Command(kind=kind, targets=tuple(zones), args=[self.config.powershell_executable, "-Command", script], script=script)
+
+    def _collect_dhcp_scope(self, scope: str, verbose: bool) -> None:
+        """Stream the leases of a DHCP scope, parse them and write them to the database as they arrive."""
+
+        # Get the table of the scope from the registry
+        table = get_dhcp_table(scope)
+        if table is None:
+            return
+
+        if verbose:
+            print(f"Processing DHCP scope: {scope}")
+
+        # Parse the leases while netsh is still running and write them in a single transaction
+        with self._stream(scope, self._dhcp_command(scope)) as lines:
+            rows = (dict(zip(LEASE_COLUMNS, lease)) for lease in iter_leases(lines, scope, on_reject=self._rejected(scope)))
+            self._store_rows(scope, table, rows, key_columns=DHCP_KEY)
+
+    def _submit_dhcp_collection(self, verbose: bool) -> Dict[Future, str]:
+        """Submit the collection of all DHCP scopes to the shared executor."""
+        return {self._submit(self._dhcp_dispatcher, self._collect_dhcp_scope, scope, verbose): f"scope {scope}" for scope in self.config.scopes}
+
+    def _dns_script(self, zones: List[str], record_types: List[str], throttle_limit: int = 0, document: bool = False) -> str:
+        """The PowerShell command that runs the DNS records script for the given zones."""
+        return build_script(
+            DNS_RECORDS_SCRIPT,
+            ServerName=self.config.dns_server,
+            ZoneNames=zones,
+            RecordTypes=record_types,
+            ThrottleLimit=throttle_limit,
+            Document=document,
+        )
+
+    def _dns_forward_command(self) -> Command:
+        """The PowerShell command that prints the records of the forward lookup zone."""
+        zones = [self.config.dns_zone]
+        return self._powershell_command("dns_forward", zones, self._dns_script(zones, self.config.dns_record_types, document=not self.config.dns_json_lines))
+
+    def _dns_reverse_command(self, zone: str) -> Command:
+        """The PowerShell command that prints the records of a reverse lookup zone."""
+        zones = [zone]
+        return self._powershell_command("dns_reverse", zones, self._dns_script(zones, self.config.dns_reverse_record_types, document=not self.config.dns_json_lines))
+
+    def _dns_reverse_batch_command(self) -> Command:
+        """The PowerShell command that prints the records of all reverse lookup zones as tagged JSON-lines."""
+        zones = self.config.dns_reverse_zones
+        return self._powershell_command("dns_reverse", zones, self._dns_script(zones, self.config.dns_reverse_record_types, throttle_limit=self.config.dns_reverse_parallel))
+
+    def _collect_dns_forward_zone(self, verbose: bool) -> None:
+        """Stream the records of the forward lookup zone, parse them and write them to the database as they arrive."""
 
-    def _get_dns_forward_data(self, verbose: bool) -> None:
-        """Gets the DNS forward lookup zone data and saves it to the database."""
-        
         if verbose:
             print(f"Processing DNS forward lookup zone: {self.config.dns_zone}")
 
-        # Define the PowerShell command to get the DNS records
-        forward_lookup_zone_powershell_command = f"""
-            $Report = [System.Collections.Generic.List[Object]]::new()
-            $zoneName = '{self.config.dns_zone}'
-            $serverName = '{self.config.dns_server}'
-            $zoneInfo = Get-DnsServerResourceRecord -ComputerName $serverName -ZoneName $zoneName
-            foreach ($info in $zoneInfo) {{
-
-            $recordData = switch ($info.RecordType) {{
-                'A'         {{ $info.RecordData.IPv4Address.IPAddressToString }}
-                'AAAA'      {{ $info.RecordData.IPv6Address.IPAddressToString }}
-                'CNAME'     {{ $info.RecordData.HostNameAlias }}
-                'MX'        {{ $info.RecordData.MailExchange }}
-                'NS'        {{ $info.RecordData.NameServer }}
-                'PTR'       {{ $info.RecordData.PtrDomainName }}
-                'SRV'       {{ "$($info.RecordData.Target) $($info.RecordData.Port)" }}
-                'TXT'       {{ -join $info.RecordData.DescriptiveText }}
-                default     {{ $null }}
-            }}
-
-            $ReportLine = [PSCustomObject]@{{
-                Name       = $zoneName
-                Hostname   = $info.Hostname
-                Type       = $info.RecordType
-                Data       = $recordData
-            }}
-            $Report.Add($ReportLine)
-            }}
-
-            # Print the results in a table format
-            $Report | ConvertTo-Json 
+        timestamp = datetime.now()
+
+        # Parse the records while PowerShell is still running and write them in a single transaction
+        with self._stream(self.config.dns_zone, self._dns_forward_command()) as lines:
+            records = iter_dns_records(lines, json_lines=self.config.dns_json_lines, on_reject=self._rejected(self.config.dns_zone))
+            rows = (forward_record_to_row(record, timestamp) for record in records)
+            self._store_rows(self.config.dns_zone, DNSModel.__table__, rows, key_columns=DNS_KEY, mode=self._dns_writer_mode, filters={"name": self.config.dns_zone})
+
+    def _collect_dns_reverse_zone(self, zone: str, verbose: bool) -> None:
+        """Stream the records of a reverse lookup zone, parse them and write them to the database as they arrive."""
+
+        if verbose:
+            print(f"Processing reverse lookup zone: {zone}")
+
+        timestamp = datetime.now()
+
+        # Parse the records while PowerShell is still running and write them in a single transaction
+        with self._stream(zone, self._dns_reverse_command(zone)) as lines:
+            records = iter_dns_records(lines, json_lines=self.config.dns_json_lines, on_reject=self._rejected(zone))
+            rows = (reverse_record_to_row(record, zone, self.config.dns_zone, timestamp) for record in records)
+            self._store_rows(zone, DNSModel.__table__, rows, key_columns=DNS_KEY, mode=self._dns_writer_mode, filters={"name": zone})
+
+    def _store_reverse_batch(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Store the rows of the batched reverse lookup zones. In incremental mode, or with
+        the history, the rows are grouped by zone, so every zone keeps its own snapshot.
         """
+        if not self._tracks_changes:
+            self._store_rows("reverse lookup zones", DNSModel.__table__, rows, key_columns=DNS_KEY, mode=self._dns_writer_mode)
+            return
 
-        # Run the powershell command
-        dns_records = subprocess.run(["powershell", "-Command", forward_lookup_zone_powershell_command], capture_output=True, text=True)
-        
-        # Parse the JSON output from PowerShell
-        for record in json.loads(dns_records.stdout):
-                
-            name = record.get("Name", "").strip()
-            hostname = record.get("Hostname", "").strip()
-            record_type = record.get("Type", "").strip()
-            data = str(record.get("Data", "")).strip()
-            timestamp = datetime.now()
+        rows_by_zone: Dict[str, List[Dict[str, Any]]] = {zone: [] for zone in self.config.dns_reverse_zones}
+        for row in rows:
+            rows_by_zone.setdefault(row["name"], []).append(row)
+        for zone, zone_rows in rows_by_zone.items():
+            self._store_rows(zone, DNSModel.__table__, zone_rows, key_columns=DNS_KEY, mode=self._dns_writer_mode, filters={"name": zone})
 
-            # Create a new DNS entry
-            new_entry = DNSModel(
-                name=name,
-                hostname=hostname,
-                record_type=record_type,
-                data=data,
-                timestamp=timestamp
-            )
-
-            # Add the new entry to the database
-            with session_scope() as session:
-                try:
-                    session.add(new_entry)
-                except Exception as e:
-                    raise DBException(f"Error adding {name} to the database: {e}")
-
-    def _get_dns_reverse_data(self, verbose: bool) -> None:
-        """Gets the DNS reverse lookup zone data and saves it to the database."""
-        
-        # Run PowerShell commands for all reverse lookup zones concurrently
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for zone in self.config.dns_reverse_zones:
-                # Define the PowerShell command to get the reverse lookup zone
-                reverse_lookup_zones_powershell_command = f"""
-                    $Report = [System.Collections.Generic.List[Object]]::new()
-                    $zoneName = '{zone}'
-                    $serverName = '{self.config.dns_server}'
-                    $zoneInfo = Get-DnsServerResourceRecord -ComputerName $serverName -ZoneName $zoneName
-                    foreach ($info in $zoneInfo) {{
-
-                    $recordData = switch ($info.RecordType) {{
-                        'PTR'       {{ $info.RecordData.PtrDomainName }}
-                        default     {{ $null }}
-                    }}
-
-                    $ReportLine = [PSCustomObject]@{{
-                        Name       = $zoneName
-                        Hostname   = $info.Hostname
-                        Type       = $info.RecordType
-                        Data       = $recordData
-                    }}
-                    $Report.Add($ReportLine)
-                    }}
-
-                    # Print the results in a table format
-                    $Report | ConvertTo-Json 
-                """
-
-                # Submit the PowerShell command to the executor
-                futures.append(executor.submit(subprocess.run, ["powershell", "-Command", reverse_lookup_zones_powershell_command], capture_output=True, text=True))
-
-            for future, zone in zip(futures, self.config.dns_reverse_zones):
-                try:
-                    reverse_dns_records = future.result()
-                    if verbose:
-                        print(f"Processing reverse lookup zone: {zone}")
-                    # Parse the JSON output from PowerShell
-                    for record in json.loads(reverse_dns_records.stdout):
-                        
-                        name = record.get("Name", "").strip()
-                        hostname = record.get("Hostname", "").strip()
-                        record_type = record.get("Type", "").strip()
-                        data = str(record.get("Data", "")).strip()
-                        timestamp = datetime.now()
-
-                        # Reverse the IP address dynamically
-                        reversed_ip = ".".join(reversed(zone[:-13].split(".")))
-
-                        # Remove the trailing forward zone name from the data
-                        if data.lower().endswith(f".{self.config.dns_zone.lower()}."):
-                            data = data[:-len(self.config.dns_zone) - 2]
-
-                        # Create a new DNS entry
-                        new_entry = DNSModel(
-                            name=name,
-                            hostname=data,
-                            record_type=record_type,
-                            data=f"{reversed_ip}.{hostname}",
-                            timestamp=timestamp
-                        )
-
-                        # Add the new entry to the database
-                        with session_scope() as session:
-                            try:
-                                session.add(new_entry)
-                            except Exception as e:
-                                raise DBException(f"Error adding {name} to the database: {e}")
-                except Exception as e:
-                    raise RuntimeError(f"Error processing zone {zone}: {e}")
-        
-    def _finalize_tables(self) -> None:
-        """Finalize the database tables by dropping the old tables and renaming the temp tables to their final names."""
-
-        # DHCP tables
-        for scope in self.config.scopes:
-            temp_table_name = f"temp_private_{scope.split('.')[2]}" if scope.startswith("10") else f"temp_public_{scope.split('.')[2]}"
-            final_table_name = temp_table_name.replace("temp_", "")
-            drop_and_rename_table(temp_table_name=temp_table_name, final_table_name=final_table_name)
-
-        # DNS table
-        drop_and_rename_table(temp_table_name="temp_dns_records", final_table_name="dns_records")
-                
-
-    def _get_data(self, verbose: bool) -> None:
-        """Get the DHCP and DNS data and save it to the database."""
+    def _collect_dns_reverse_zones_batched(self, verbose: bool) -> None:
+        """Stream the records of all reverse lookup zones from a single PowerShell script and write them to the database."""
+
+        if verbose:
+            print(f"Processing reverse lookup zones: {', '.join(self.config.dns_reverse_zones)}")
+
+        timestamp = datetime.now()
+
+        # The records are tagged with their zone name, so they can be parsed while PowerShell moves through the zones
+        with self._stream("reverse lookup zones", self._dns_reverse_batch_command()) as lines:
+            records = iter_dns_records(lines, on_reject=self._rejected("reverse lookup zones"))
+            self._store_reverse_batch(reverse_record_to_row(record, record["Name"], self.config.dns_zone, timestamp) for record in records)
+
+    def _submit_dns_forward_collection(self, verbose: bool) -> Dict[Future, str]:
+        """Submit the collection of the forward lookup zone to the shared executor."""
+        return {self._submit(self._dns_dispatcher, self._collect_dns_forward_zone, verbose): f"zone {self.config.dns_zone}"}
+
+    def _submit_dns_reverse_collection(self, verbose: bool) -> Dict[Future, str]:
+        """Submit the collection of all reverse lookup zones to the shared executor."""
+        if self.config.dns_reverse_batched:
+            return {self._submit(self._dns_dispatcher, self._collect_dns_reverse_zones_batched, verbose): "reverse lookup zones"}
+        return {self._submit(self._dns_dispatcher, self._collect_dns_reverse_zone, zone, verbose): f"zone {zone}" for zone in self.config.dns_reverse_zones}
+
+    def _temp_tables(self, collectors: Collection[str]) -> List[Table]:
+        """The temp tables written by the given collectors, the DNS forward and reverse collectors share the DNS table."""
+        tables = [get_dhcp_table(scope) for scope in self.config.scopes] if "dhcp" in collectors else []
+        if "dns_forward" in collectors or "dns_reverse" in collectors:
+            tables.append(DNSModel.__table__)
+        return tables
+
+    def _copy_dns_records(self, collectors: Collection[str]) -> None:
+        """
+        Copy the DNS records of the zones that are not collected in this cycle from the
+        final DNS table, so swapping the DNS table keeps the records of the other collector.
+        """
+        final_table = get_final_table(DNSModel.__table__)
+        if not tables_exist([final_table]):
+            return
+
+        collected_zones = [self.config.dns_zone] if "dns_forward" in collectors else self.config.dns_reverse_zones
+        copy_rows(final_table, DNSModel.__table__, column="name", excluded_values=collected_zones)
+
+    def _finalize_tables(self, collectors: Collection[str] = COLLECTORS) -> None:
+        """Finalize the database tables by swapping the temp tables of the given collectors with their final tables."""
+
+        # Wait for the old tables of the previous cycle to be dropped
+        if self._cleanup_thread is not None:
+            self._cleanup_thread.join()
+
+        with self.instrumentation.timer("finalize"):
+            # Only one of the DNS collectors ran, keep the records of the other one
+            if ("dns_forward" in collectors) != ("dns_reverse" in collectors):
+                self._copy_dns_records(collectors)
+
+            # The fast loaded tables have no unique keys, remove the duplicates before the keys are added
+            temp_tables = self._temp_tables(collectors)
+            if self.config.fast_load:
+                with self.instrumentation.timer("deduplicate"):
+                    for table in temp_tables:
+                        self.instrumentation.count("rows_deduplicated", deduplicate_rows(table), source=table.name.replace("temp_", ""))
+
+            # Build the indexes after the bulk load, before the tables are swapped
+            with self.instrumentation.timer("build_indexes"):
+                build_indexes(temp_tables, unique=self.config.fast_load)
+
+            # Rename all the tables at once, the old tables are dropped in the background
+            table_names = [(table.name, table.name.replace("temp_", "")) for table in temp_tables]
+            self._cleanup_thread = swap_tables(table_names)
+
+        self._write_pending_history()
+
+    def _write_pending_history(self) -> None:
+        """Write the changes of a full cycle to the history after its tables were swapped, and keep their snapshots."""
+        for source, table, delta, current in self._pending_history:
+            self._write_history(source, table, delta)
+            self._snapshots[source] = current
+        self._pending_history.clear()
+
+    def _prepare_tables(self, collectors: Collection[str] = COLLECTORS) -> None:
+        """Initialize the database connection and create the temp tables of the given collectors, unless only the changes are written."""
+        initialize_and_create_tables(create_tables=False)
+
+        # Discard the changes of a failed cycle, they were never applied to the final tables
+        self._pending_history.clear()
+
+        # Only write the changes if incremental mode is enabled and the final tables are in place
+        temp_tables = self._temp_tables(collectors)
+        final_tables = [get_final_table(table) for table in temp_tables]
+        self._incremental = self.config.sync_mode == "incremental" and tables_exist(final_tables)
+        if self._incremental:
+            # The changes are written to the final tables, make sure they have their indexes
+            build_indexes(final_tables)
+        else:
+            # Create the temp tables, the snapshots are reloaded after the tables are swapped unless the history keeps them
+            create_temp_tables(temp_tables, bare=self.config.fast_load)
+            if not self.config.history_enabled:
+                self._snapshots.clear()
+
+        if self.config.history_enabled:
+            self._rotate_history()
+
+    def _rotate_history(self) -> None:
+        """Create the history tables and rotate their partitions, once a day."""
+        today = date.today()
+        if self._history_day == today:
+            return
+        with self.instrumentation.timer("history_rotation"):
+            create_history_tables()
+            rotate_history_partitions(self.config.history_retention_days, self.config.history_precreate_days, today)
+        self._history_day = today
+
+    def _get_data(self, verbose: bool, collectors: Collection[str] = COLLECTORS) -> None:
+        """Get the DHCP and DNS data of the given collectors and save it to the database."""
         # Set the start time
         start_time = datetime.now()
-        # Initialize the database connection and create tables
-        initialize_and_create_tables()
-
-        # Run DHCP and DNS data collection concurrently
-        with ThreadPoolExecutor() as executor:
-            futures = [
-                executor.submit(self._get_dhcp_data, verbose),
-                executor.submit(self._get_dns_forward_data, verbose),
-                executor.submit(self._get_dns_reverse_data, verbose)
-            ]
-            for future in futures:
+
+        try:
+            # Initialize the database connection and create the tables
+            with self.instrumentation.timer("prepare"):
+                self._prepare_tables(collectors)
+
+            # Run the collection of the DHCP scopes and DNS zones on the shared executor
+            futures: Dict[Future, str] = {}
+            if "dhcp" in collectors:
+                futures.update(self._submit_dhcp_collection(verbose))
+            if "dns_forward" in collectors:
+                futures.update(self._submit_dns_forward_collection(verbose))
+            if "dns_reverse" in collectors:
+                futures.update(self._submit_dns_reverse_collection(verbose))
+            for future, source in futures.items():
                 try:
                     future.result()
                 except Exception as e:
-                    raise RuntimeError(f"Error occurred during execution: {e}")
-                
+                    self.instrumentation.count("errors", source=source)
+                    raise RuntimeError(f"Error processing {source}: {e}")
+
             # Drop the old tables and rename the temp tables to their final names
-            self._finalize_tables()
-        
+            if not self._incremental:
+                self._finalize_tables(collectors)
+        except Exception:
+            self.instrumentation.count("cycle_failures")
+            raise
+        finally:
+            # Send the timers and counters of the cycle to the sinks, also when the cycle failed
+            self.instrumentation.observe("cycle", (datetime.now() - start_time).total_seconds())
+            self.instrumentation.emit()
+
         if verbose:
             # Print the total runtime
             print(f"Total runtime: {datetime.now() - start_time}")
 
-    def run(self, verbose: bool, interval: int) -> None:
-        """Run the Client Parser application loop."""
+    async def _store_rows_async(self, source: str, table: Table, rows: AsyncIterator[Dict[str, Any]], key_columns: Tuple[str, ...], mode: str = "executemany", filters: Optional[Dict[str, Any]] = None) -> None:
+        """Store the rows of a DHCP scope or DNS zone as they are parsed by an async collector."""
+        if self._tracks_changes:
+            # The delta needs the full snapshot, so collect the rows first
+            collected_rows = [row async for row in rows]
+            await asyncio.to_thread(self._store_rows, source, table, collected_rows, key_columns, mode, filters)
+            return
+
+        # The rows are counted as they are parsed, like the rows of the threaded collectors
+        rows_parsed = 0
+        async with AsyncBatchWriter(table, mode=mode, fast_load=self.config.fast_load) as writer:
+            async for row in rows:
+                rows_parsed += 1
+                await writer.add(row)
+        self.instrumentation.count("rows_parsed", rows_parsed, source=source)
+        self.instrumentation.count("rows_inserted", writer.rows_written, source=source)
+
+    async def _aiter_leases(self, lines: AsyncIterator[str], scope: str, timestamp: datetime) -> AsyncIterator[Dict[str, Any]]:
+        """Parse the netsh output into lease rows as the lines are read, with a single parser for the whole output."""
+        parse = lease_parser(scope, timestamp, on_reject=self._rejected(scope))
+        async for line in lines:
+            lease = parse(line)
+            if lease is not None:
+                yield dict(zip(LEASE_COLUMNS, lease))
+
+    async def _aiter_dns_records(self, lines: AsyncIterator[str], source: str, json_lines: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Parse the PowerShell output into DNS records as the lines are read."""
+        if not json_lines:
+            buffered_lines = [line async for line in lines]
+            for record in iter_dns_records(buffered_lines, json_lines=False):
+                yield record
+            return
+
+        parse = dns_record_parser(on_reject=self._rejected(source))
+        async for line in lines:
+            record = parse(line)
+            if record is not None:
+                yield record
+
+    async def _collect_dhcp_scope_async(self, scope: str, limiter: asyncio.Semaphore, verbose: bool) -> None:
+        """Stream the leases of a DHCP scope through an asyncio subprocess and write them to the database."""
+
+        # Get the table of the scope from the registry
+        table = get_dhcp_table(scope)
+        if table is None:
+            return
+
+        async with limiter:
+            if verbose:
+                print(f"Processing DHCP scope: {scope}")
+
+            timestamp = datetime.now()
+            async with self._astream(scope, self._dhcp_command(scope)) as lines:
+                await self._store_rows_async(scope, table, self._aiter_leases(lines, scope, timestamp), key_columns=DHCP_KEY)
+
+    async def _collect_dns_forward_zone_async(self, limiter: asyncio.Semaphore, verbose: bool) -> None:
+        """Stream the records of the forward lookup zone through an asyncio subprocess and write them to the database."""
+
+        async with limiter:
+            if verbose:
+                print(f"Processing DNS forward lookup zone: {self.config.dns_zone}")
 
-        # Create a loop that runs the application every 5 minutes
-        is_last_run = False
-        last_runtime: datetime = datetime.now()
+            timestamp = datetime.now()
+            async with self._astream(self.config.dns_zone, self._dns_forward_command()) as lines:
+                records = self._aiter_dns_records(lines, self.config.dns_zone, json_lines=self.config.dns_json_lines)
+                rows = (forward_record_to_row(record, timestamp) async for record in records)
+                await self._store_rows_async(self.config.dns_zone, DNSModel.__table__, rows, key_columns=DNS_KEY, mode=self._dns_writer_mode, filters={"name": self.config.dns_zone})
+
+    async def _collect_dns_reverse_zone_async(self, zone: str, limiter: asyncio.Semaphore, verbose: bool) -> None:
+        """Stream the records of a reverse lookup zone through an asyncio subprocess and write them to the database."""
+
+        async with limiter:
+            if verbose:
+                print(f"Processing reverse lookup zone: {zone}")
+
+            timestamp = datetime.now()
+            async with self._astream(zone, self._dns_reverse_command(zone)) as lines:
+                records = self._aiter_dns_records(lines, zone, json_lines=self.config.dns_json_lines)
+                rows = (reverse_record_to_row(record, zone, self.config.dns_zone, timestamp) async for record in records)
+                await self._store_rows_async(zone, DNSModel.__table__, rows, key_columns=DNS_KEY, mode=self._dns_writer_mode, filters={"name": zone})
+
+    async def _collect_dns_reverse_zones_batched_async(self, limiter: asyncio.Semaphore, verbose: bool) -> None:
+        """Stream the records of all reverse lookup zones from a single PowerShell script and write them to the database."""
 
-        while not is_last_run:
+        async with limiter:
+            if verbose:
+                print(f"Processing reverse lookup zones: {', '.join(self.config.dns_reverse_zones)}")
+
+            timestamp = datetime.now()
+            async with self._astream("reverse lookup zones", self._dns_reverse_batch_command()) as lines:
+                records = self._aiter_dns_records(lines, "reverse lookup zones")
+                rows = (reverse_record_to_row(record, record["Name"], self.config.dns_zone, timestamp) async for record in records)
+                if self._tracks_changes:
+                    await asyncio.to_thread(self._store_reverse_batch, [row async for row in rows])
+                else:
+                    await self._store_rows_async("reverse lookup zones", DNSModel.__table__, rows, key_columns=DNS_KEY, mode=self._dns_writer_mode)
+
+    async def _get_data_async(self, verbose: bool, collectors: Collection[str] = COLLECTORS) -> None:
+        """Get the DHCP and DNS data of the given collectors with the asyncio engine and save it to the database."""
+        # Set the start time
+        start_time = datetime.now()
+
+        try:
+            # Initialize the database connection and create the tables
+            with self.instrumentation.timer("prepare"):
+                await asyncio.to_thread(self._prepare_tables, collectors)
+
+            # Limit the concurrent commands per server
+            dhcp_limiter = asyncio.Semaphore(self.config.dhcp_server_concurrency)
+            dns_limiter = asyncio.Semaphore(self.config.dns_server_concurrency)
+
+            # Run the collection of the DHCP scopes and DNS zones on the event loop
+            tasks = {}
+            if "dhcp" in collectors:
+                tasks.update({f"scope {scope}": self._collect_dhcp_scope_async(scope, dhcp_limiter, verbose) for scope in self.config.scopes})
+            if "dns_forward" in collectors:
+                tasks[f"zone {self.config.dns_zone}"] = self._collect_dns_forward_zone_async(dns_limiter, verbose)
+            if "dns_reverse" in collectors and self.config.dns_reverse_batched:
+                tasks["reverse lookup zones"] = self._collect_dns_reverse_zones_batched_async(dns_limiter, verbose)
+            elif "dns_reverse" in collectors:
+                tasks.update({f"zone {zone}": self._collect_dns_reverse_zone_async(zone, dns_limiter, verbose) for zone in self.config.dns_reverse_zones})
+
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            for source, result in zip(tasks, results):
+                if isinstance(result, Exception):
+                    self.instrumentation.count("errors", source=source)
+                    raise RuntimeError(f"Error processing {source}: {result}")
+
+            # Drop the old tables and rename the temp tables to their final names
+            if not self._incremental:
+                await asyncio.to_thread(self._finalize_tables, collectors)
+        except Exception:
+            self.instrumentation.count("cycle_failures")
+            raise
+        finally:
+            # Send the timers and counters of the cycle to the sinks, also when the cycle failed
+            self.instrumentation.observe("cycle", (datetime.now() - start_time).total_seconds())
+            self.instrumentation.emit()
+
+        if verbose:
+            # Print the total runtime
+            print(f"Total runtime: {datetime.now() - start_time}")
+
+    def run_async(self, verbose: bool, interval: int, overrun: str = "skip") -> None:
+        """Run the Client Parser application loop with the asyncio collection engine."""
+        self.run(verbose=verbose, interval=interval, use_async=True, overrun=overrun)
+
+    def _due_collectors(self, boundary: float, intervals: Dict[str, int]) -> List[str]:
+        """
+        The collectors that are due at a scheduler boundary: the ones that did not run
+        yet and the ones whose interval started a new period since their last run.
+        """
+        due_collectors = []
+        for collector, collector_interval in intervals.items():
+            last_run = self._last_runs.get(collector)
+            if last_run is None or boundary // collector_interval > last_run // collector_interval:
+                due_collectors.append(collector)
+        return due_collectors
+
+    def stop(self) -> None:
+        """Stop the application loop after the running cycle."""
+        if self._scheduler is not None:
+            self._scheduler.stop()
+
+    def run(self, verbose: bool, interval: int, use_async: bool = False, overrun: str = "skip") -> None:
+        """
+        Run the Client Parser application loop. With an interval the cycles start on
+        fixed boundaries of the interval, the overrun policy decides what happens when
+        a cycle runs past the next boundary.
+        """
 
+        def get_data(collectors: Collection[str] = COLLECTORS) -> None:
+            with self.profiler.cycle() as profile_path:
+                if use_async:
+                    asyncio.run(self._get_data_async(verbose=verbose, collectors=collectors))
+                else:
+                    self._get_data(verbose=verbose, collectors=collectors)
+            if verbose and profile_path is not None:
+                print(f"Profile written to {profile_path}")
+
+        # Every collector runs on its own interval, or on the application interval if it is not set
+        intervals = {
+            "dhcp": self.config.dhcp_interval or interval,
+            "dns_forward": self.config.dns_forward_interval or interval,
+            "dns_reverse": self.config.dns_reverse_interval or interval,
+        }
+
+        def run_due_collectors(boundary: float) -> None:
+            collectors = self._due_collectors(boundary, intervals)
+            if collectors:
+                get_data(collectors)
+                self._last_runs.update((collector, boundary) for collector in collectors)
+
+        def on_wait(delay: float) -> None:
+            if verbose:
+                # Display the next runtime
+                print(f"Next run in {delay:.0f} seconds")
+
+        def on_skip(missed: int) -> None:
+            self.instrumentation.count("cycles_skipped", missed)
+            if verbose:
+                print(f"The last cycle overran the interval, skipped {missed} run(s)")
+
+        try:
             # Check if the interval is set
             if interval == 0:
-                is_last_run = True
-                # Get the data
-                self._get_data(verbose=verbose)
-            
-            elif (datetime.now() - last_runtime).seconds >= interval:
-                last_runtime = datetime.now()
-                # Get the data
-                self._get_data(verbose=verbose)
-
-                # Update the last runtime
-                last_runtime = datetime.now()
-
-            # Display the next runtime
-            if interval != 0:
-                next_runtime = last_runtime + timedelta(seconds=interval)
-
-                if verbose:
-                    print(f"Next run in {(next_runtime - datetime.now()).seconds} seconds")
-
-                # Sleep for a second
-                time.sleep(1)
+                get_data()
+                return
+
+            # Run the due collectors on every boundary of the common interval until the application is stopped
+            self._scheduler = Scheduler(math.gcd(*intervals.values()), overrun=overrun)
+            self._scheduler.run(run_due_collectors, on_wait=on_wait, on_skip=on_skip)
+        finally:
+            # Stop the collector threads and the command runner once the application loop ends
+            self._executor.shutdown(wait=True)
+            self.runner.close()
+            self.instrumentation.close()
+            # Wait for the old tables to be dropped before the connections are closed
+            if self._cleanup_thread is not None:
+                self._cleanup_thread.join()
+            dispose_db()
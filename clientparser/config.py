@@ -13,16 +13,18 @@
 # Copyright (C) 2025 NSF SEES, USA
 # ----------------------------------------------------------------------------------
 
+import json
 import os
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional
 
 __all__ = ["Config"]
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file, unless it is disabled, e.g. by the tests
+if os.getenv("CLIENTPARSER_LOAD_DOTENV", "true").lower() == "true":
+    load_dotenv()
 
 # Find the .env file in the root directory
 env_path = Path(__file__).resolve().parent.parent / ".env"
@@ -38,6 +40,43 @@ class Config:
     _dns_zone: str = field(init=False, compare=False, repr=False)
     _dns_reverse_zones: List[str] = field(init=False, compare=False, repr=False)
     _database_uri: str = field(init=False, compare=False, repr=False)
+    _db_pool_size: int = field(init=False, compare=False, repr=False)
+    _db_max_overflow: int = field(init=False, compare=False, repr=False)
+    _db_pool_timeout: int = field(init=False, compare=False, repr=False)
+    _db_pool_pre_ping: bool = field(init=False, compare=False, repr=False)
+    _db_pool_recycle: int = field(init=False, compare=False, repr=False)
+    _db_isolation_level: Optional[str] = field(init=False, compare=False, repr=False)
+    _db_connect_args: Dict[str, Any] = field(init=False, compare=False, repr=False)
+    _batch_size: int = field(init=False, compare=False, repr=False)
+    _dns_load_data_infile: bool = field(init=False, compare=False, repr=False)
+    _dns_json_lines: bool = field(init=False, compare=False, repr=False)
+    _sync_mode: str = field(init=False, compare=False, repr=False)
+    _fast_load: bool = field(init=False, compare=False, repr=False)
+    _compact_schema: bool = field(init=False, compare=False, repr=False)
+    _history_enabled: bool = field(init=False, compare=False, repr=False)
+    _history_retention_days: int = field(init=False, compare=False, repr=False)
+    _history_precreate_days: int = field(init=False, compare=False, repr=False)
+    _max_collector_workers: int = field(init=False, compare=False, repr=False)
+    _dhcp_server_concurrency: int = field(init=False, compare=False, repr=False)
+    _dns_server_concurrency: int = field(init=False, compare=False, repr=False)
+    _powershell_executable: str = field(init=False, compare=False, repr=False)
+    _powershell_pool_size: int = field(init=False, compare=False, repr=False)
+    _dns_reverse_batched: bool = field(init=False, compare=False, repr=False)
+    _dns_reverse_parallel: int = field(init=False, compare=False, repr=False)
+    _dns_record_types: List[str] = field(init=False, compare=False, repr=False)
+    _dns_reverse_record_types: List[str] = field(init=False, compare=False, repr=False)
+    _command_runner: str = field(init=False, compare=False, repr=False)
+    _fixture_dir: str = field(init=False, compare=False, repr=False)
+    _synthetic_leases: int = field(init=False, compare=False, repr=False)
+    _synthetic_records: int = field(init=False, compare=False, repr=False)
+    _instrumentation_sinks: List[str] = field(init=False, compare=False, repr=False)
+    _metrics_json_path: str = field(init=False, compare=False, repr=False)
+    _metrics_textfile_path: str = field(init=False, compare=False, repr=False)
+    _metrics_port: int = field(init=False, compare=False, repr=False)
+    _metrics_address: str = field(init=False, compare=False, repr=False)
+    _dhcp_interval: int = field(init=False, compare=False, repr=False)
+    _dns_forward_interval: int = field(init=False, compare=False, repr=False)
+    _dns_reverse_interval: int = field(init=False, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         self._scopes = (os.getenv("SCOPES").replace("[", "").replace("]", "").replace(" ", "").split(","))
@@ -46,6 +85,43 @@ class Config:
         self._dns_zone = os.getenv("DNS_ZONE")
         self._dns_reverse_zones = (os.getenv("DNS_REVERSE_ZONES").replace("[", "").replace("]", "").replace(" ", "").split(","))
         self._database_uri = os.getenv("DATABASE_URI")
+        self._db_pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self._db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "2"))
+        self._db_pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self._db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+        self._db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+        self._db_isolation_level = os.getenv("DB_ISOLATION_LEVEL", "").upper() or None
+        self._db_connect_args = json.loads(os.getenv("DB_CONNECT_ARGS", "") or "{}")
+        self._batch_size = int(os.getenv("BATCH_SIZE", "1000"))
+        self._dns_load_data_infile = os.getenv("DNS_LOAD_DATA_INFILE", "false").lower() == "true"
+        self._dns_json_lines = os.getenv("DNS_JSON_LINES", "true").lower() == "true"
+        self._sync_mode = os.getenv("SYNC_MODE", "full").lower()
+        self._fast_load = os.getenv("FAST_LOAD", "false").lower() == "true"
+        self._compact_schema = os.getenv("COMPACT_SCHEMA", "false").lower() == "true"
+        self._history_enabled = os.getenv("HISTORY_ENABLED", "false").lower() == "true"
+        self._history_retention_days = int(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+        self._history_precreate_days = int(os.getenv("HISTORY_PRECREATE_DAYS", "3"))
+        self._max_collector_workers = int(os.getenv("MAX_COLLECTOR_WORKERS", "8"))
+        self._dhcp_server_concurrency = int(os.getenv("DHCP_SERVER_CONCURRENCY", "4"))
+        self._dns_server_concurrency = int(os.getenv("DNS_SERVER_CONCURRENCY", "4"))
+        self._powershell_executable = os.getenv("POWERSHELL_EXECUTABLE", "powershell")
+        self._powershell_pool_size = int(os.getenv("POWERSHELL_POOL_SIZE", "0"))
+        self._dns_reverse_batched = os.getenv("DNS_REVERSE_BATCHED", "false").lower() == "true"
+        self._dns_reverse_parallel = int(os.getenv("DNS_REVERSE_PARALLEL", "0"))
+        self._dns_record_types = [record_type for record_type in os.getenv("DNS_RECORD_TYPES", "").replace("[", "").replace("]", "").replace(" ", "").split(",") if record_type]
+        self._dns_reverse_record_types = [record_type for record_type in os.getenv("DNS_REVERSE_RECORD_TYPES", "").replace("[", "").replace("]", "").replace(" ", "").split(",") if record_type]
+        self._command_runner = os.getenv("COMMAND_RUNNER", "subprocess").lower()
+        self._fixture_dir = os.getenv("FIXTURE_DIR", "fixtures")
+        self._synthetic_leases = int(os.getenv("SYNTHETIC_LEASES", "1000"))
+        self._synthetic_records = int(os.getenv("SYNTHETIC_RECORDS", "1000"))
+        self._instrumentation_sinks = [sink.lower() for sink in os.getenv("INSTRUMENTATION_SINKS", "").replace("[", "").replace("]", "").replace(" ", "").split(",") if sink]
+        self._metrics_json_path = os.getenv("METRICS_JSON_PATH", "metrics.jsonl")
+        self._metrics_textfile_path = os.getenv("METRICS_TEXTFILE_PATH", "clientparser.prom")
+        self._metrics_port = int(os.getenv("METRICS_PORT", "0"))
+        self._metrics_address = os.getenv("METRICS_ADDRESS", "")
+        self._dhcp_interval = int(os.getenv("DHCP_INTERVAL", "0"))
+        self._dns_forward_interval = int(os.getenv("DNS_FORWARD_INTERVAL", "0"))
+        self._dns_reverse_interval = int(os.getenv("DNS_REVERSE_INTERVAL", "0"))
 
     @property
     def scopes(self) -> List[str]:
@@ -70,3 +146,151 @@ class Config:
     @property
     def database_uri(self) -> str:
         return self._database_uri
+
+    @property
+    def db_pool_size(self) -> int:
+        return self._db_pool_size
+
+    @property
+    def db_max_overflow(self) -> int:
+        return self._db_max_overflow
+
+    @property
+    def db_pool_timeout(self) -> int:
+        return self._db_pool_timeout
+
+    @property
+    def db_pool_pre_ping(self) -> bool:
+        return self._db_pool_pre_ping
+
+    @property
+    def db_pool_recycle(self) -> int:
+        return self._db_pool_recycle
+
+    @property
+    def db_isolation_level(self) -> Optional[str]:
+        return self._db_isolation_level
+
+    @property
+    def db_connect_args(self) -> Dict[str, Any]:
+        return self._db_connect_args
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def dns_load_data_infile(self) -> bool:
+        return self._dns_load_data_infile
+
+    @property
+    def dns_json_lines(self) -> bool:
+        return self._dns_json_lines
+
+    @property
+    def sync_mode(self) -> str:
+        return self._sync_mode
+
+    @property
+    def fast_load(self) -> bool:
+        return self._fast_load
+
+    @property
+    def compact_schema(self) -> bool:
+        return self._compact_schema
+
+    @property
+    def history_enabled(self) -> bool:
+        return self._history_enabled
+
+    @property
+    def history_retention_days(self) -> int:
+        return self._history_retention_days
+
+    @property
+    def history_precreate_days(self) -> int:
+        return self._history_precreate_days
+
+    @property
+    def max_collector_workers(self) -> int:
+        return self._max_collector_workers
+
+    @property
+    def dhcp_server_concurrency(self) -> int:
+        return self._dhcp_server_concurrency
+
+    @property
+    def dns_server_concurrency(self) -> int:
+        return self._dns_server_concurrency
+
+    @property
+    def powershell_executable(self) -> str:
+        return self._powershell_executable
+
+    @property
+    def powershell_pool_size(self) -> int:
+        return self._powershell_pool_size
+
+    @property
+    def dns_reverse_batched(self) -> bool:
+        return self._dns_reverse_batched
+
+    @property
+    def dns_reverse_parallel(self) -> int:
+        return self._dns_reverse_parallel
+
+    @property
+    def dns_record_types(self) -> List[str]:
+        return self._dns_record_types
+
+    @property
+    def dns_reverse_record_types(self) -> List[str]:
+        return self._dns_reverse_record_types
+
+    @property
+    def command_runner(self) -> str:
+        return self._command_runner
+
+    @property
+    def fixture_dir(self) -> str:
+        return self._fixture_dir
+
+    @property
+    def synthetic_leases(self) -> int:
+        return self._synthetic_leases
+
+    @property
+    def synthetic_records(self) -> int:
+        return self._synthetic_records
+
+    @property
+    def instrumentation_sinks(self) -> List[str]:
+        return self._instrumentation_sinks
+
+    @property
+    def metrics_json_path(self) -> str:
+        return self._metrics_json_path
+
+    @property
+    def metrics_textfile_path(self) -> str:
+        return self._metrics_textfile_path
+
+    @property
+    def metrics_port(self) -> int:
+        return self._metrics_port
+
+    @property
+    def metrics_address(self) -> str:
+        return self._metrics_address
+
+    @property
+    def dhcp_interval(self) -> int:
+        return self._dhcp_interval
+
+    @property
+    def dns_forward_interval(self) -> int:
+        return self._dns_forward_interval
+
+    @property
+    def dns_reverse_interval(self) -> int:
+        return self._dns_reverse_interval
@@ -12,14 +12,24 @@
 # Copyright (C) 2025 NSF SEES, USA
 # ----------------------------------------------------------------------------------
 
+import asyncio
+import os
+import tempfile
+import threading
 from contextlib import contextmanager
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, text, inspect
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from sqlalchemy import create_engine, and_, bindparam, func, select, Column, Index, Integer, MetaData, String, DateTime, Table, text, inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.declarative import declared_attr, declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from clientparser.config import Config
+from clientparser.types import IPv4Address, MACAddress
 
-__all__ = ["initialize_and_create_tables", "session_scope", "DHCPModel", "DNSModel" "DBException"]
+__all__ = [
+    "initialize_and_create_tables", "create_temp_tables", "session_scope", "batch_writer", "BatchWriter", "AsyncBatchWriter", "get_dhcp_model", "get_dhcp_table",
+    "get_final_table", "tables_exist", "fetch_rows", "copy_rows", "apply_changes", "deduplicate_rows", "build_indexes", "drop_and_rename_table", "swap_tables", "pool_status", "dispose_db", "DHCPModel", "DNSModel", "DBException",
+]
 
 
 config = Config()
@@ -31,15 +41,72 @@ Base = declarative_base()
 global db_engine, db_session
 db_engine = None
 db_session = None
+# Guards the creation of the engine, the collectors may initialize it from their threads
+_engine_lock = threading.Lock()
+
+# Registry of the DHCP models and their tables, keyed by scope
+dhcp_models: Dict[str, Type["DHCPModel"]] = {}
+dhcp_tables: Dict[str, Table] = {}
+
+# Metadata of the final tables, the temp tables are copied here with their final names
+final_metadata = MetaData()
 
 
 def initialize_db():
-    """Initialize the database connection."""
-    db_engine = create_engine(config.database_uri, pool_size=10, max_overflow=2, pool_timeout=30)
-    db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=db_engine))
+    """Initialize the database connection. The engine and its pool are created once and reused by every cycle."""
+    global db_engine, db_session
+    with _engine_lock:
+        if db_engine is None:
+            db_engine = create_engine(config.database_uri, **_engine_options())
+            db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=db_engine))
     return db_engine, db_session, Base
 
 
+def _engine_options() -> Dict[str, Any]:
+    """The pool, isolation level and driver options of the engine from the config."""
+    connect_args = dict(config.db_connect_args)
+    # LOAD DATA LOCAL INFILE must be allowed by the client as well
+    if config.dns_load_data_infile and config.database_uri.startswith(("mysql", "mariadb")):
+        connect_args["local_infile"] = True
+
+    options = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        "pool_pre_ping": config.db_pool_pre_ping,
+        "pool_recycle": config.db_pool_recycle,
+        "connect_args": connect_args,
+    }
+    if config.db_isolation_level is not None:
+        options["isolation_level"] = config.db_isolation_level
+    return options
+
+
+def dispose_db() -> None:
+    """Close the connections of the engine pool, the next initialization creates a new engine."""
+    global db_engine, db_session
+    with _engine_lock:
+        if db_session is not None:
+            db_session.remove()
+        if db_engine is not None:
+            db_engine.dispose()
+        db_engine = None
+        db_session = None
+
+
+def pool_status() -> Dict[str, int]:
+    """The size, checked out and overflow connections of the engine pool, empty if the engine is not initialized."""
+    if db_engine is None:
+        return {}
+    status = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        # Not every pool class keeps track of all of them, e.g. the SQLite memory pools
+        method = getattr(db_engine.pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
+
+
 @contextmanager
 def session_scope():
     """Provide a transactional scope for the database session."""
@@ -56,22 +123,323 @@ def session_scope():
         db_session.close()
 
 
-def initialize_and_create_tables():
+class BatchWriter:
+    """
+    Collect rows for a single table and write them to the database once the batch
+    size is reached. The rows are written with one of the following modes:
+        - executemany: a single INSERT statement executed for all the rows
+        - multirow: a single INSERT statement with multiple VALUES rows
+        - infile: LOAD DATA LOCAL INFILE from a temporary file (MariaDB/MySQL only)
+    """
+
+    modes = ("executemany", "multirow", "infile")
+
+    def __init__(self, connection: Connection, table: Table, batch_size: int, mode: str = "executemany") -> None:
+        if mode not in self.modes:
+            raise ValueError(f"Unknown batch writer mode: {mode}")
+        # LOAD DATA is only available on MariaDB/MySQL, use multi-row inserts otherwise
+        if mode == "infile" and connection.dialect.name not in ("mysql", "mariadb"):
+            mode = "multirow"
+
+        self.connection = connection
+        self.table = table
+        self.batch_size = batch_size
+        self.mode = mode
+        self.rows_written = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._statement = table.insert()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Add a row to the current batch and flush it if the batch is full."""
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def add_all(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add all the rows of an iterable to the writer."""
+        for row in rows:
+            self.add(row)
+
+    def flush(self) -> None:
+        """Write the pending rows to the database."""
+        if not self._rows:
+            return
+        try:
+            if self.mode == "multirow":
+                self.connection.execute(self._statement.values(self._rows))
+            elif self.mode == "infile":
+                self._load_data_infile()
+            else:
+                self.connection.execute(self._statement, self._rows)
+        except Exception as e:
+            raise DBException(f"Error writing {len(self._rows)} rows to {self.table.name}: {e}")
+        self.rows_written += len(self._rows)
+        self._rows = []
+
+    def _load_data_infile(self) -> None:
+        """Write the pending rows to a temporary file and load it with LOAD DATA LOCAL INFILE."""
+        columns = list(self._rows[0].keys())
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", newline="", encoding="utf-8", delete=False) as infile:
+            for row in self._rows:
+                infile.write("\t".join(_escape_infile_value(row[column]) for column in columns) + "\n")
+        try:
+            self.connection.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{infile.name.replace(os.sep, '/')}' INTO TABLE {self.table.name} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(columns)})"
+            )
+        finally:
+            os.remove(infile.name)
+
+
+def _escape_infile_value(value: Any) -> str:
+    """Escape a value for a tab separated LOAD DATA file."""
+    if value is None:
+        return r"\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+@contextmanager
+def batch_writer(table: Table, batch_size: Optional[int] = None, mode: str = "executemany", fast_load: bool = False):
+    """
+    Provide a batch writer for the given table. All the batches are written in a
+    single transaction that is committed when the context exits. With fast load
+    the unique and foreign key checks of the session are disabled on MariaDB/MySQL
+    while the rows are written.
+    """
+    global db_engine
+    if db_engine is None:
+        db_engine, _, _ = initialize_db()
+
+    with db_engine.connect() as connection:
+        skip_checks = fast_load and connection.dialect.name in ("mysql", "mariadb")
+        if skip_checks:
+            connection.exec_driver_sql("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        try:
+            with connection.begin():
+                writer = BatchWriter(connection=connection, table=table, batch_size=batch_size or config.batch_size, mode=mode)
+                yield writer
+                writer.flush()
+        finally:
+            # Restore the checks before the connection goes back to the pool
+            if skip_checks:
+                connection.exec_driver_sql("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+
+
+class AsyncBatchWriter:
+    """
+    Async counterpart of the batch writer. The rows are collected on the event loop
+    and every full batch is written by a worker thread in the same transaction, so
+    the loop never blocks on the database.
+    """
+
+    def __init__(self, table: Table, batch_size: Optional[int] = None, mode: str = "executemany", fast_load: bool = False) -> None:
+        self.table = table
+        self.batch_size = batch_size or config.batch_size
+        self.mode = mode
+        self.fast_load = fast_load
+        self._rows: List[Dict[str, Any]] = []
+
+    async def __aenter__(self) -> "AsyncBatchWriter":
+        self._context = batch_writer(self.table, batch_size=self.batch_size, mode=self.mode, fast_load=self.fast_load)
+        self._writer = await asyncio.to_thread(self._context.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            await self.flush()
+        await asyncio.to_thread(self._context.__exit__, exc_type, exc_value, traceback)
+
+    @property
+    def rows_written(self) -> int:
+        return self._writer.rows_written
+
+    async def add(self, row: Dict[str, Any]) -> None:
+        """Add a row to the current batch and flush it if the batch is full."""
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write the pending rows to the database from a worker thread."""
+        rows, self._rows = self._rows, []
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.add_all(rows)
+        self._writer.flush()
+
+
+def initialize_and_create_tables(create_tables: bool = True):
     """Initialize the database connection and create tables."""
     global db_engine, db_session, Base
     db_engine, db_session, Base = initialize_db()
-    dns_model = DNSModel()
-    dhcp_models = DHCPModel.create_dhcp_models(config.scopes)
 
-    for model in dhcp_models:
+    # Build the scope registry once, so the collectors don't have to resolve the models
+    dhcp_models.clear()
+    dhcp_tables.clear()
+    for model in DHCPModel.create_dhcp_models(config.scopes):
+        dhcp_models[model.scope] = model
+        dhcp_tables[model.scope] = model.__table__
+
+    if create_tables:
+        create_temp_tables()
+
+
+def create_temp_tables(tables: Optional[Iterable[Table]] = None, bare: bool = False):
+    """
+    Drop and create the given temp tables, by default the tables of all scopes and the DNS records.
+    Bare tables are created without their unique keys, they are added by build_indexes after the load.
+    """
+    global db_engine
+    if tables is None:
+        tables = [model.__table__ for model in dhcp_models.values()] + [DNSModel.__table__]
+
+    for table in tables:
         # Drop the table if it exists
-        model.__table__.drop(bind=db_engine, checkfirst=True)  
+        table.drop(bind=db_engine, checkfirst=True)
         # Create the table
-        model.__table__.create(bind=db_engine, checkfirst=True)
+        (_bare_table(table) if bare else table).create(bind=db_engine, checkfirst=True)
+
+
+def _bare_table(table: Table) -> Table:
+    """A copy of the table with only its columns and primary key."""
+    columns = [Column(column.name, column.type, primary_key=column.primary_key, autoincrement=column.autoincrement, nullable=column.nullable) for column in table.columns]
+    return Table(table.name, MetaData(), *columns)
+
+
+def get_dhcp_model(scope: str) -> Optional[Type["DHCPModel"]]:
+    """Get the DHCP model of a scope from the registry."""
+    return dhcp_models.get(scope)
 
-    # Drop and create the DNS table
-    dns_model.__table__.drop(bind=db_engine, checkfirst=True)
-    dns_model.__table__.create(bind=db_engine, checkfirst=True)
+
+def get_dhcp_table(scope: str) -> Optional[Table]:
+    """Get the Core table of a scope from the registry, used for the bulk inserts."""
+    return dhcp_tables.get(scope)
+
+
+def get_final_table(table: Table) -> Table:
+    """Get a copy of a temp table that points to its final table name."""
+    final_table_name = table.name.replace("temp_", "")
+    if final_table_name not in final_metadata.tables:
+        table.to_metadata(final_metadata, name=final_table_name)
+    return final_metadata.tables[final_table_name]
+
+
+def tables_exist(tables: Iterable[Table]) -> bool:
+    """Check if all the given tables exist in the database."""
+    global db_engine
+    inspector = inspect(db_engine)
+    return all(inspector.has_table(table.name) for table in tables)
+
+
+def fetch_rows(table: Table, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Fetch all the rows of a table, without their id, optionally filtered by column values."""
+    global db_engine
+    columns = [column for column in table.columns if column.name != "id"]
+    statement = select(*columns)
+    for column, value in (filters or {}).items():
+        statement = statement.where(table.c[column] == value)
+
+    with db_engine.connect() as connection:
+        return [dict(row) for row in connection.execute(statement).mappings()]
+
+
+def copy_rows(source_table: Table, target_table: Table, column: str, excluded_values: Iterable[Any]) -> int:
+    """
+    Copy the rows of a table into another table with the same columns, except the
+    rows whose column value is one of the excluded values. The ids are not copied.
+    """
+    global db_engine
+    columns = [table_column.name for table_column in source_table.columns if table_column.name != "id"]
+    statement = target_table.insert().from_select(
+        columns,
+        select(*(source_table.c[name] for name in columns)).where(source_table.c[column].not_in(list(excluded_values))),
+    )
+    try:
+        with db_engine.begin() as connection:
+            return connection.execute(statement).rowcount
+    except Exception as e:
+        raise DBException(f"Error copying the rows of {source_table.name} to {target_table.name}: {e}")
+
+
+def apply_changes(table: Table, inserts: List[Dict[str, Any]], updates: List[Dict[str, Any]], deletes: List[Dict[str, Any]], key_columns: Iterable[str], filters: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Apply the inserted, updated and deleted rows to a table in a single transaction.
+    The rows are matched on the key columns and the optional filter column values.
+    """
+    global db_engine
+    key_columns = list(key_columns)
+    filters = filters or {}
+
+    # Match the rows on the key columns, bound with a prefix to not clash with the updated values
+    condition = and_(
+        *(table.c[column] == bindparam(f"key_{column}") for column in key_columns),
+        *(table.c[column] == value for column, value in filters.items()),
+    )
+
+    def key_params(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {f"key_{column}": row[column] for column in key_columns}
+
+    try:
+        with db_engine.begin() as connection:
+            # Delete first, so the inserted rows never clash with unique keys of deleted rows
+            if deletes:
+                connection.execute(table.delete().where(condition), [key_params(row) for row in deletes])
+            if updates:
+                value_columns = [column for column in updates[0] if column not in key_columns]
+                connection.execute(table.update().where(condition), [{**key_params(row), **{column: row[column] for column in value_columns}} for row in updates])
+            if inserts:
+                connection.execute(table.insert(), inserts)
+    except Exception as e:
+        raise DBException(f"Error applying changes to {table.name}: {e}")
+
+
+def deduplicate_rows(table: Table) -> int:
+    """
+    Delete the duplicates of the unique columns of a table that was loaded without its
+    unique keys, keeping the last inserted row of every value. Returns the number of deleted rows.
+    """
+    global db_engine
+    deleted = 0
+    with db_engine.begin() as connection:
+        for column in [column for column in table.columns if column.unique]:
+            # MariaDB/MySQL can not select from the table of the DELETE, the ids are kept in a derived table
+            keep = select(func.max(table.c.id).label("id")).group_by(column).subquery("keep")
+            result = connection.execute(table.delete().where(table.c.id.not_in(select(keep.c.id))))
+            deleted += result.rowcount
+    return deleted
+
+
+def build_indexes(tables: Iterable[Table], unique: bool = False) -> None:
+    """
+    Build the deferred indexes of the given tables, declared in their "deferred_indexes"
+    info, so the bulk load does not have to maintain them. With unique the unique keys
+    of bare tables are added as well. The indexes are named after the final table, so
+    they keep their names after the swap. SQLite index names are unique per database,
+    so the same index of the live table is dropped first.
+    """
+    global db_engine
+    for table in tables:
+        final_table_name = table.name.replace("temp_", "")
+        indexes = [(f"ix_{final_table_name}_{'_'.join(columns)}", columns, False) for columns in table.info.get("deferred_indexes", ())]
+        if unique:
+            indexes += [(f"uq_{final_table_name}_{column.name}", (column.name,), True) for column in table.columns if column.unique]
+
+        for index_name, columns, is_unique in indexes:
+            if db_engine.dialect.name == "sqlite" and table.name != final_table_name:
+                with db_engine.begin() as connection:
+                    connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+            index = Index(index_name, *(table.c[column] for column in columns), unique=is_unique)
+            try:
+                index.create(bind=db_engine, checkfirst=True)
+            except Exception as e:
+                raise DBException(f"Error building the index {index_name} of {table.name}: {e}")
+            finally:
+                # Do not keep the index on the table, or it would be created with the table in the next cycle
+                table.indexes.discard(index)
 
 
 def drop_and_rename_table(temp_table_name: str, final_table_name: str):
@@ -79,7 +447,7 @@ def drop_and_rename_table(temp_table_name: str, final_table_name: str):
     global db_engine
     inspector = inspect(db_engine)
 
-    with db_engine.connect() as connection:
+    with db_engine.begin() as connection:
         # Check if the final table exists and drop it
         if inspector.has_table(final_table_name):
             connection.execute(text(f"DROP TABLE {final_table_name}"))
@@ -91,13 +459,52 @@ def drop_and_rename_table(temp_table_name: str, final_table_name: str):
             raise RuntimeError(f"Temporary table '{temp_table_name}' does not exist. Cannot rename.")
 
 
+def swap_tables(table_names: List[Tuple[str, str]]) -> Optional[threading.Thread]:
+    """
+    Swap all the temp tables with their final tables. On MariaDB/MySQL all the tables
+    are renamed with a single atomic RENAME TABLE statement, so readers never see a
+    missing table, and the old tables are dropped in a background thread that is
+    returned. Other databases fall back to dropping and renaming each table.
+    """
+    global db_engine
+    if db_engine.dialect.name not in ("mysql", "mariadb"):
+        for temp_table_name, final_table_name in table_names:
+            drop_and_rename_table(temp_table_name=temp_table_name, final_table_name=final_table_name)
+        return None
+
+    inspector = inspect(db_engine)
+    old_table_names = ", ".join(f"{final_table_name}_old" for _, final_table_name in table_names)
+    renames = []
+    for temp_table_name, final_table_name in table_names:
+        if not inspector.has_table(temp_table_name):
+            raise RuntimeError(f"Temporary table '{temp_table_name}' does not exist. Cannot rename.")
+        # Move the current table out of the way, unless this is the first run
+        if inspector.has_table(final_table_name):
+            renames.append(f"{final_table_name} TO {final_table_name}_old")
+        renames.append(f"{temp_table_name} TO {final_table_name}")
+
+    with db_engine.begin() as connection:
+        # Drop any old tables left behind by an interrupted run
+        connection.execute(text(f"DROP TABLE IF EXISTS {old_table_names}"))
+        connection.execute(text(f"RENAME TABLE {', '.join(renames)}"))
+
+    def drop_old_tables() -> None:
+        with db_engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {old_table_names}"))
+
+    cleanup_thread = threading.Thread(target=drop_old_tables, name="drop-old-tables")
+    cleanup_thread.start()
+    return cleanup_thread
+
+
 class DHCPModel(Base):
     """
     Abstract base class for DHCP models. Each subclass will have a table name
     based on the scope.
     """
     __abstract__ = True
-    __table_args__ = {"extend_existing": True}
+    # The indexes are built after the bulk load, see build_indexes
+    __table_args__ = {"extend_existing": True, "info": {"deferred_indexes": (("ip",), ("hostname",))}}
 
     @declared_attr
     def __tablename__(cls):
@@ -112,11 +519,12 @@ class DHCPModel(Base):
         return f"{scope_name}"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ip = Column(String(15), nullable=False)
-    mac_address = Column(String(26), nullable=False, unique=True)
+    # The compact schema stores the addresses as integers and bytes, see clientparser.types
+    ip = Column(IPv4Address() if config.compact_schema else String(15), nullable=False)
+    mac_address = Column(MACAddress() if config.compact_schema else String(26), nullable=False, unique=True)
     lease_status = Column(String(255), nullable=False)
     hostname = Column(String(255), nullable=True)
-    subnet = Column(String(15), nullable=False)
+    subnet = Column(IPv4Address() if config.compact_schema else String(15), nullable=False)
     timestamp = Column(DateTime, nullable=False)
 
     # Cache for dynamically created models
@@ -139,6 +547,8 @@ class DHCPModel(Base):
 class DNSModel(Base):
     """DNS model for storing DNS records."""
     __tablename__ = "temp_dns_records"
+    # The indexes are built after the bulk load, see build_indexes
+    __table_args__ = {"info": {"deferred_indexes": (("record_type", "hostname"), ("hostname",), ("data",))}}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/dispatcher.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the dispatcher of the collection tasks of a server. It
+# limits the concurrent commands per server before the tasks reach the shared
+# executor, so the tasks waiting for one server never hold its threads.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Tuple
+
+__all__ = ["ServerDispatcher"]
+
+
+class ServerDispatcher:
+    """
+    Submit the tasks of a server to a shared executor, at most limit of them at a time.
+    The tasks over the limit wait in the queue of the dispatcher instead of a thread of
+    the executor, and the next one is submitted when a running task is done.
+    """
+
+    def __init__(self, executor: Executor, limit: int) -> None:
+        self.executor = executor
+        self.limit = max(limit, 1)
+        self._running = 0
+        self._pending: Deque[Tuple[Future, Callable[..., Any], Tuple[Any, ...]]] = deque()
+        self._lock = threading.Lock()
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        """Queue a task and return its future, it is submitted to the executor once the limit allows it."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((future, function, args))
+        self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        """Submit the pending tasks to the executor while the limit allows it."""
+        while True:
+            with self._lock:
+                if self._running >= self.limit or not self._pending:
+                    return
+                future, function, args = self._pending.popleft()
+                self._running += 1
+
+            # Skip the tasks that were cancelled while they were waiting
+            if not future.set_running_or_notify_cancel():
+                self._done()
+                continue
+            try:
+                self.executor.submit(self._run, future, function, args)
+            except RuntimeError as e:
+                # The executor is shut down
+                future.set_exception(e)
+                self._done()
+
+    def _run(self, future: Future, function: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        try:
+            result = function(*args)
+        except BaseException as e:
+            self._done()
+            future.set_exception(e)
+        else:
+            self._done()
+            future.set_result(result)
+        self._dispatch()
+
+    def _done(self) -> None:
+        with self._lock:
+            self._running -= 1
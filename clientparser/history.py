@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/history.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the history tables of the DHCP leases and DNS records. The
+# changes between the cycles are appended to them, and on MariaDB/MySQL they are
+# partitioned by day, so the old history is dropped a partition at a time.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, text
+
+from clientparser import database
+from clientparser.config import Config
+from clientparser.database import DNSModel, DBException
+from clientparser.sync import Delta
+from clientparser.types import IPv4Address, MACAddress
+
+__all__ = [
+    "dhcp_lease_history", "dns_record_history", "get_history_table", "create_history_tables", "write_history", "rotate_history_partitions",
+]
+
+config = Config()
+
+# The history tables are not swapped, so they have their own metadata
+history_metadata = MetaData()
+
+# The history tables have no primary key, MariaDB requires the partition column in every unique key
+dhcp_lease_history = Table(
+    "dhcp_lease_history",
+    history_metadata,
+    Column("ip", IPv4Address() if config.compact_schema else String(15), nullable=False),
+    Column("mac_address", MACAddress() if config.compact_schema else String(26), nullable=False),
+    Column("lease_status", String(255), nullable=False),
+    Column("hostname", String(255), nullable=True),
+    Column("subnet", IPv4Address() if config.compact_schema else String(15), nullable=False),
+    Column("change_type", String(6), nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Index("ix_dhcp_lease_history_mac_address_timestamp", "mac_address", "timestamp"),
+    Index("ix_dhcp_lease_history_ip_timestamp", "ip", "timestamp"),
+)
+
+dns_record_history = Table(
+    "dns_record_history",
+    history_metadata,
+    Column("name", String(255), nullable=False),
+    Column("hostname", String(255), nullable=False),
+    Column("record_type", String(10), nullable=False),
+    Column("data", String(255), nullable=False),
+    Column("change_type", String(6), nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Index("ix_dns_record_history_hostname_timestamp", "hostname", "timestamp"),
+    Index("ix_dns_record_history_data_timestamp", "data", "timestamp"),
+)
+
+# The partition that holds the rows after the last daily partition
+MAX_PARTITION = "pmax"
+
+
+def get_history_table(table: Table) -> Table:
+    """Get the history table of a DHCP or DNS temp table."""
+    return dns_record_history if table.name == DNSModel.__tablename__ else dhcp_lease_history
+
+
+def create_history_tables() -> None:
+    """Create the history tables if they do not exist."""
+    history_metadata.create_all(bind=database.db_engine, checkfirst=True)
+
+
+def write_history(history_table: Table, delta: Delta, timestamp: datetime) -> int:
+    """Append the inserted, updated and deleted rows of a delta to a history table. Returns the number of written rows."""
+    columns = [column.name for column in history_table.columns if column.name not in ("change_type", "timestamp")]
+    rows: List[Dict[str, Any]] = []
+    for change_type, changed_rows in (("insert", delta.inserts), ("update", delta.updates), ("delete", delta.deletes)):
+        rows.extend({**{column: row.get(column) for column in columns}, "change_type": change_type, "timestamp": timestamp} for row in changed_rows)
+
+    if rows:
+        try:
+            with database.db_engine.begin() as connection:
+                connection.execute(history_table.insert(), rows)
+        except Exception as e:
+            raise DBException(f"Error writing the history to {history_table.name}: {e}")
+    return len(rows)
+
+
+def _partition_name(day: date) -> str:
+    """The name of the partition of a day."""
+    return f"p{day.strftime('%Y%m%d')}"
+
+
+def _partition_definitions(days: List[date]) -> str:
+    """The definitions of the daily partitions, followed by the partition of the later rows."""
+    partitions = [f"PARTITION {_partition_name(day)} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1)}'))" for day in days]
+    return ", ".join(partitions + [f"PARTITION {MAX_PARTITION} VALUES LESS THAN MAXVALUE"])
+
+
+def _partition_days(table: Table) -> List[date]:
+    """The days of the daily partitions of a table, empty if the table is not partitioned."""
+    with database.db_engine.connect() as connection:
+        names = connection.execute(
+            text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name AND PARTITION_NAME IS NOT NULL"
+            ),
+            {"table_name": table.name},
+        ).scalars().all()
+    return sorted(datetime.strptime(name[1:], "%Y%m%d").date() for name in names if name != MAX_PARTITION)
+
+
+def rotate_history_partitions(retention_days: int, precreate_days: int, today: date) -> None:
+    """
+    Keep the history of the last retention days. On MariaDB/MySQL the history tables are
+    partitioned by day, the partitions of the next precreate days are added ahead of time
+    and the partitions older than the retention are dropped. The other databases delete
+    the old rows.
+    """
+    cutoff = today - timedelta(days=retention_days)
+    for table in history_metadata.sorted_tables:
+        try:
+            if database.db_engine.dialect.name not in ("mysql", "mariadb"):
+                with database.db_engine.begin() as connection:
+                    connection.execute(table.delete().where(table.c.timestamp < datetime.combine(cutoff, datetime.min.time())))
+                continue
+
+            days = _partition_days(table)
+            with database.db_engine.begin() as connection:
+                # Partition the table, the rows before today go to the first partition
+                if not days:
+                    new_days = [today + timedelta(days=offset) for offset in range(precreate_days + 1)]
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name} PARTITION BY RANGE (TO_DAYS(timestamp)) ({_partition_definitions(new_days)})")
+                    continue
+
+                # Split the days up to the precreated days off the last partition
+                first_day = max(days[-1] + timedelta(days=1), today)
+                new_days = [first_day + timedelta(days=offset) for offset in range((today + timedelta(days=precreate_days) - first_day).days + 1)]
+                if new_days:
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name} REORGANIZE PARTITION {MAX_PARTITION} INTO ({_partition_definitions(new_days)})")
+
+                # Drop the partitions whose days are all before the retention
+                old_days = [day for day in days if day < cutoff]
+                if old_days:
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name} DROP PARTITION {', '.join(_partition_name(day) for day in old_days)}")
+        except Exception as e:
+            raise DBException(f"Error rotating the history of {table.name}: {e}")
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/metrics.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the instrumentation of the collection cycle. The timers
+# and counters are labelled by DHCP scope or DNS zone, aggregated per cycle and
+# sent to the configured sinks at the end of every cycle.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AsyncContextManager, AsyncIterator, Callable, ContextManager, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from clientparser.config import Config
+
+__all__ = [
+    "Instrumentation", "CycleMetrics", "MetricsSink", "LoggingSink", "JsonLinesSink", "PrometheusTextfileSink", "PrometheusHttpSink", "Histogram",
+    "create_instrumentation",
+]
+
+
+T = TypeVar("T")
+
+# A metric is identified by its name and its sorted labels
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Timing(NamedTuple):
+    """The number of times a timer was recorded and the total seconds."""
+    count: int
+    seconds: float
+
+
+class CycleMetrics(NamedTuple):
+    """The timers and counters recorded during a collection cycle."""
+    timestamp: datetime
+    timers: Dict[MetricKey, Timing]
+    counters: Dict[MetricKey, float]
+
+
+class _Phase:
+    """An active phase, it collects the time spent in the phases nested in it."""
+    __slots__ = ("nested_seconds",)
+
+    def __init__(self) -> None:
+        self.nested_seconds = 0.0
+
+
+# The active phase of the current thread or asyncio task
+_active_phase: ContextVar[Optional[_Phase]] = ContextVar("active_phase", default=None)
+
+
+def _key(name: str, labels: Dict[str, str]) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Instrumentation:
+    """
+    Collect the timers and counters of the collection cycles. There are three kinds of timers:
+        - timer: the wall-clock time of a block, e.g. a whole cycle
+        - stream timer: the time spent in a command stream, without the time its consumer
+          spends on the lines, e.g. writing them to the database
+        - phase: the time spent in a block minus the time spent in the phases nested in it,
+          so reading, parsing and inserting can be told apart while they are interleaved
+    Nothing is measured if no sinks are configured.
+    """
+
+    def __init__(self, sinks: Optional[List["MetricsSink"]] = None) -> None:
+        self.sinks = sinks or []
+        self._lock = threading.Lock()
+        self._timers: Dict[MetricKey, Timing] = {}
+        self._counters: Dict[MetricKey, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def observe(self, name: str, seconds: float, count: int = 1, **labels: str) -> None:
+        """Add a measured duration to a timer."""
+        key = _key(name, labels)
+        with self._lock:
+            timing = self._timers.get(key, Timing(0, 0.0))
+            self._timers[key] = Timing(timing.count + count, timing.seconds + seconds)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increase a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Record the wall-clock time of a block."""
+        if not self.enabled:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    @contextmanager
+    def stream_timer(self, stream: ContextManager[Iterable[T]], name: str, **labels: str) -> Iterator[Iterator[T]]:
+        """Enter a stream and record the time spent entering it, producing its items and leaving it."""
+        if not self.enabled:
+            with stream as items:
+                yield iter(items)
+            return
+        perf_counter = time.perf_counter
+        seconds = 0.0
+
+        def timed_items(iterator: Iterator[T]) -> Iterator[T]:
+            nonlocal seconds
+            while True:
+                start_time = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += perf_counter() - start_time
+                yield item
+
+        start_time = perf_counter()
+        try:
+            with stream as items:
+                seconds += perf_counter() - start_time
+                yield timed_items(iter(items))
+                start_time = perf_counter()
+            seconds += perf_counter() - start_time
+        finally:
+            self.observe(name, seconds, **labels)
+
+    @asynccontextmanager
+    async def astream_timer(self, stream: AsyncContextManager[AsyncIterator[T]], name: str, **labels: str) -> AsyncIterator[AsyncIterator[T]]:
+        """Enter an async stream and record the time spent entering it, producing its items and leaving it."""
+        if not self.enabled:
+            async with stream as items:
+                yield items
+            return
+        perf_counter = time.perf_counter
+        seconds = 0.0
+
+        async def timed_items(iterator: AsyncIterator[T]) -> AsyncIterator[T]:
+            nonlocal seconds
+            while True:
+                start_time = perf_counter()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    seconds += perf_counter() - start_time
+                yield item
+
+        start_time = perf_counter()
+        try:
+            async with stream as items:
+                seconds += perf_counter() - start_time
+                yield timed_items(items)
+                start_time = perf_counter()
+            seconds += perf_counter() - start_time
+        finally:
+            self.observe(name, seconds, **labels)
+
+    @contextmanager
+    def phase(self, name: str, **labels: str) -> Iterator[None]:
+        """Record the time spent in a block, without the time spent in the phases nested in it."""
+        if not self.enabled:
+            yield
+            return
+        phase = _Phase()
+        parent = _active_phase.get()
+        token = _active_phase.set(phase)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            _active_phase.reset(token)
+            if parent is not None:
+                parent.nested_seconds += elapsed
+            self.observe(name, elapsed - phase.nested_seconds, **labels)
+
+    def iter_phase(self, items: Iterable[T], name: str, counter: Optional[str] = None, **labels: str) -> Iterator[T]:
+        """
+        Record the time spent producing the items of an iterable as a phase, and
+        optionally count the items. The time is summed locally and recorded once
+        the iterable is exhausted, so the overhead per item stays small.
+        """
+        if not self.enabled:
+            return iter(items)
+        return self._iter_phase(iter(items), name, counter, labels)
+
+    def _iter_phase(self, iterator: Iterator[T], name: str, counter: Optional[str], labels: Dict[str, str]) -> Iterator[T]:
+        phase = _Phase()
+        seconds = 0.0
+        items_count = 0
+        perf_counter = time.perf_counter
+        try:
+            while True:
+                parent = _active_phase.get()
+                token = _active_phase.set(phase)
+                phase.nested_seconds = 0.0
+                start_time = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = perf_counter() - start_time
+                    _active_phase.reset(token)
+                    if parent is not None:
+                        parent.nested_seconds += elapsed
+                    seconds += elapsed - phase.nested_seconds
+                items_count += 1
+                yield item
+        finally:
+            self.observe(name, seconds, **labels)
+            if counter is not None:
+                self.count(counter, items_count, **labels)
+
+    def emit(self) -> CycleMetrics:
+        """Send the metrics of the current cycle to the sinks and start a new cycle."""
+        with self._lock:
+            metrics = CycleMetrics(datetime.now(), self._timers, self._counters)
+            self._timers, self._counters = {}, {}
+
+        for sink in self.sinks:
+            try:
+                sink.emit(metrics)
+            except Exception as e:
+                # A broken sink must not stop the collection
+                print(f"Error writing the metrics to {type(sink).__name__}: {e}")
+        return metrics
+
+    def close(self) -> None:
+        """Close all the sinks."""
+        for sink in self.sinks:
+            sink.close()
+
+
+class MetricsSink:
+    """Base class of the metrics sinks, they receive the metrics at the end of every cycle."""
+
+    def emit(self, metrics: CycleMetrics) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the resources of the sink."""
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return " ".join(f"{label}={value}" for label, value in labels)
+
+
+class LoggingSink(MetricsSink):
+    """Log one line per timer and counter."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        self.logger = logger or logging.getLogger("clientparser.metrics")
+        # Make sure the metrics are printed if the application did not configure logging
+        if not self.logger.hasHandlers():
+            self.logger.addHandler(logging.StreamHandler())
+            self.logger.setLevel(logging.INFO)
+
+    def emit(self, metrics: CycleMetrics) -> None:
+        for (name, labels), timing in sorted(metrics.timers.items()):
+            self.logger.info(f"timer {name} {_format_labels(labels)}: {timing.seconds:.3f}s ({timing.count}x)")
+        for (name, labels), value in sorted(metrics.counters.items()):
+            self.logger.info(f"counter {name} {_format_labels(labels)}: {value:g}")
+
+
+class JsonLinesSink(MetricsSink):
+    """Append the metrics of every cycle to a file as a single JSON object."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def emit(self, metrics: CycleMetrics) -> None:
+        document = {
+            "timestamp": metrics.timestamp.isoformat(),
+            "timers": [{"name": name, "labels": dict(labels), "count": timing.count, "seconds": timing.seconds} for (name, labels), timing in metrics.timers.items()],
+            "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in metrics.counters.items()],
+        }
+        with open(self.path, "a", encoding="utf-8") as metrics_file:
+            metrics_file.write(json.dumps(document) + "\n")
+
+
+def _prometheus_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = {label: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for label, value in labels}
+    return "{" + ",".join(f'{label}="{value}"' for label, value in escaped.items()) + "}"
+
+
+class PrometheusTextfileSink(MetricsSink):
+    """
+    Write the metrics of the last cycle in the Prometheus text format, for the
+    textfile collector of the node exporter. The file is replaced atomically.
+    """
+
+    prefix = "clientparser"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def emit(self, metrics: CycleMetrics) -> None:
+        lines: List[str] = []
+
+        def add_metric(metric_name: str, help_text: str, samples: List[Tuple[Tuple[Tuple[str, str], ...], float]]) -> None:
+            lines.append(f"# HELP {metric_name} {help_text}")
+            lines.append(f"# TYPE {metric_name} gauge")
+            lines.extend(f"{metric_name}{_prometheus_labels(labels)} {value}" for labels, value in samples)
+
+        for name in sorted({name for name, _ in metrics.timers}):
+            samples = [(labels, timing.seconds) for (timer_name, labels), timing in metrics.timers.items() if timer_name == name]
+            add_metric(f"{self.prefix}_{name}_seconds", f"Seconds spent in {name} during the last cycle.", samples)
+        for name in sorted({name for name, _ in metrics.counters}):
+            samples = [(labels, value) for (counter_name, labels), value in metrics.counters.items() if counter_name == name]
+            add_metric(f"{self.prefix}_{name}", f"Number of {name.replace('_', ' ')} during the last cycle.", samples)
+        add_metric(f"{self.prefix}_last_cycle_timestamp_seconds", "Unix time of the end of the last cycle.", [((), metrics.timestamp.timestamp())])
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as textfile:
+            textfile.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.path)
+
+
+class Histogram:
+    """A cumulative Prometheus histogram, the buckets are the upper bounds in seconds."""
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[index] += 1
+
+    def samples(self, metric_name: str, labels: Tuple[Tuple[str, str], ...] = ()) -> List[str]:
+        lines = [f"{metric_name}_bucket{_prometheus_labels(labels + (('le', f'{bucket:g}'),))} {count}" for bucket, count in zip(self.buckets, self.counts)]
+        lines.append(f"{metric_name}_bucket{_prometheus_labels(labels + (('le', '+Inf'),))} {self.count}")
+        lines.append(f"{metric_name}_sum{_prometheus_labels(labels)} {self.sum}")
+        lines.append(f"{metric_name}_count{_prometheus_labels(labels)} {self.count}")
+        return lines
+
+
+class PrometheusHttpSink(MetricsSink):
+    """
+    Serve cumulative metrics over all cycles on /metrics, from a background thread.
+    It is meant for the daemon mode, so slow, failing or stuck cycles can be alerted on.
+    """
+
+    prefix = "clientparser"
+    cycle_buckets = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+    source_buckets = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+    def __init__(self, port: int, address: str = "", pool_status: Optional[Callable[[], Dict[str, int]]] = None) -> None:
+        self.pool_status = pool_status
+        self._lock = threading.Lock()
+        self._cycle_duration = Histogram(self.cycle_buckets)
+        self._source_durations: Dict[Tuple[Tuple[str, str], ...], Histogram] = {}
+        self._phase_seconds: Dict[MetricKey, float] = {}
+        self._rows: Dict[MetricKey, float] = {}
+        self._cycles = 0
+        self._failures = 0
+        self._last_cycle: Optional[float] = None
+        self._last_success: Optional[float] = None
+
+        sink = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = sink.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                # Do not print a line for every scrape
+                pass
+
+        self._server = ThreadingHTTPServer((address, port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def emit(self, metrics: CycleMetrics) -> None:
+        with self._lock:
+            self._cycles += 1
+            self._last_cycle = metrics.timestamp.timestamp()
+            if any(name == "cycle_failures" for name, _ in metrics.counters):
+                self._failures += 1
+            else:
+                self._last_success = self._last_cycle
+
+            for (name, labels), timing in metrics.timers.items():
+                if name == "cycle":
+                    self._cycle_duration.observe(timing.seconds)
+                elif name == "collect":
+                    self._source_durations.setdefault(labels, Histogram(self.source_buckets)).observe(timing.seconds)
+                elif labels:
+                    key = _key(name, dict(labels))
+                    self._phase_seconds[key] = self._phase_seconds.get(key, 0.0) + timing.seconds
+
+            for (name, labels), value in metrics.counters.items():
+                if name.startswith("rows_"):
+                    key = (name[len("rows_"):], labels)
+                    self._rows[key] = self._rows.get(key, 0) + value
+
+    def render(self) -> str:
+        """Render all the metrics in the Prometheus text format."""
+        prefix = self.prefix
+        lines: List[str] = []
+
+        def add_header(metric_name: str, metric_type: str, help_text: str) -> None:
+            lines.append(f"# HELP {metric_name} {help_text}")
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+
+        with self._lock:
+            add_header(f"{prefix}_cycle_duration_seconds", "histogram", "Duration of the collection cycles.")
+            lines.extend(self._cycle_duration.samples(f"{prefix}_cycle_duration_seconds"))
+
+            add_header(f"{prefix}_source_duration_seconds", "histogram", "Time spent in the command of a DHCP scope or DNS zone: starting it, reading its output and closing it.")
+            for labels, histogram in sorted(self._source_durations.items()):
+                lines.extend(histogram.samples(f"{prefix}_source_duration_seconds", labels))
+
+            add_header(f"{prefix}_phase_seconds_total", "counter", "Seconds spent in each phase of the collection of a DHCP scope or DNS zone.")
+            for (phase, labels), seconds in sorted(self._phase_seconds.items()):
+                lines.append(f"{prefix}_phase_seconds_total{_prometheus_labels(labels + (('phase', phase),))} {seconds}")
+
+            add_header(f"{prefix}_rows_total", "counter", "Rows of a DHCP scope or DNS zone by result: parsed, rejected, inserted, updated or deleted.")
+            for (result, labels), value in sorted(self._rows.items()):
+                lines.append(f"{prefix}_rows_total{_prometheus_labels(labels + (('result', result),))} {value:g}")
+
+            add_header(f"{prefix}_cycles_total", "counter", "Number of collection cycles.")
+            lines.append(f"{prefix}_cycles_total {self._cycles}")
+            add_header(f"{prefix}_cycle_failures_total", "counter", "Number of failed collection cycles.")
+            lines.append(f"{prefix}_cycle_failures_total {self._failures}")
+
+            for metric_name, help_text, value in (
+                (f"{prefix}_last_cycle_timestamp_seconds", "Unix time of the end of the last cycle.", self._last_cycle),
+                (f"{prefix}_last_success_timestamp_seconds", "Unix time of the end of the last successful cycle.", self._last_success),
+            ):
+                if value is not None:
+                    add_header(metric_name, "gauge", help_text)
+                    lines.append(f"{metric_name} {value}")
+
+        # The pool is read on every scrape, so it shows the connections of a running cycle
+        for name, value in (self.pool_status() if self.pool_status is not None else {}).items():
+            add_header(f"{prefix}_db_pool_{name}", "gauge", f"Connections of the database pool: {name}.")
+            lines.append(f"{prefix}_db_pool_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def create_instrumentation(config: Config, metrics_port: Optional[int] = None, pool_status: Optional[Callable[[], Dict[str, int]]] = None) -> Instrumentation:
+    """
+    Create the instrumentation with the sinks selected in the configuration. The
+    metrics endpoint is started if a port is given here or in the configuration.
+    """
+    sinks: List[MetricsSink] = []
+    for sink_name in config.instrumentation_sinks:
+        if sink_name == "logging":
+            sinks.append(LoggingSink())
+        elif sink_name == "jsonl":
+            sinks.append(JsonLinesSink(config.metrics_json_path))
+        elif sink_name == "prometheus":
+            sinks.append(PrometheusTextfileSink(config.metrics_textfile_path))
+        else:
+            raise ValueError(f"Unknown instrumentation sink: {sink_name}")
+
+    metrics_port = metrics_port if metrics_port is not None else config.metrics_port
+    if metrics_port:
+        sinks.append(PrometheusHttpSink(metrics_port, address=config.metrics_address, pool_status=pool_status))
+    return Instrumentation(sinks)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/parsers/__init__.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This package includes the parsers for the DHCP and DNS command outputs.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from clientparser.parsers.dhcp import LEASE_COLUMNS, parse_lease, parse_leases, lease_parser, iter_leases
+from clientparser.parsers.dns import dns_record_parser, iter_dns_records, forward_record_to_row, reverse_record_to_row
+
+__all__ = [
+    "LEASE_COLUMNS", "parse_lease", "parse_leases", "lease_parser", "iter_leases",
+    "dns_record_parser", "iter_dns_records", "forward_record_to_row", "reverse_record_to_row",
+]
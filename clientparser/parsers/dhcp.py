@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/parsers/dhcp.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This is the parser for the output of the "netsh dhcp server ... show clients 1"
+# command.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import re
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+__all__ = ["LEASE_PATTERN", "LEASE_COLUMNS", "parse_lease", "parse_leases", "lease_parser", "iter_leases"]
+
+
+# A lease line looks like:
+# 10.0.1.10  - 255.255.255.0  - 00-15-5d-01-02-03  - 3/20/2025 4:12:05 PM  -D-  host.domain.local
+LEASE_PATTERN = re.compile(
+    r"^(?P<ip>1[^\s-]*)[ \t]*-[^-\r\n]*-[ \t]*(?P<mac>\S+?)[ \t]*-[ \t]*(?P<lease_status>[^-\r\n]*?)[ \t]*-[NUD]-[ \t]*(?P<hostname>[^.\r\n]*)",
+    re.MULTILINE,
+)
+
+# The column names of the lease tuples, in order
+LEASE_COLUMNS = ("ip", "mac_address", "lease_status", "hostname", "subnet", "timestamp")
+
+Lease = Tuple[str, str, str, str, str, datetime]
+
+
+def _to_lease(match: re.Match, subnet: str, timestamp: datetime) -> Lease:
+    """Convert a lease pattern match to a lease tuple."""
+    ip_address, mac_address, lease_status, hostname = match.groups()
+    mac_address = mac_address.upper().replace("-", ":")
+
+    # Check if the MAC address is longer than the normal length (17 characters)
+    if len(mac_address) > 17:
+        mac_address = mac_address + ":XX"
+
+    return ip_address, mac_address, lease_status, hostname.strip().lower(), subnet, timestamp
+
+
+def parse_lease(line: str, scope: str, timestamp: Optional[datetime] = None) -> Optional[Lease]:
+    """Parse a single lease line. Returns None if the line is not a lease."""
+    match = LEASE_PATTERN.match(line)
+    if match is None:
+        return None
+    return _to_lease(match, scope.split()[0], timestamp or datetime.now())
+
+
+def parse_leases(output: str, scope: str, timestamp: Optional[datetime] = None) -> List[Lease]:
+    """Parse the full netsh output of a scope. All the leases share a single timestamp."""
+    subnet = scope.split()[0]
+    timestamp = timestamp or datetime.now()
+    return [_to_lease(match, subnet, timestamp) for match in LEASE_PATTERN.finditer(output)]
+
+
+def lease_parser(scope: str, timestamp: Optional[datetime] = None, on_reject: Optional[Callable[[str], None]] = None) -> Callable[[str], Optional[Lease]]:
+    """
+    Create a parser of the netsh output lines of a scope. It returns the lease of a
+    line, or None for the other lines. Lines that look like a lease but do not match
+    the lease pattern are passed to on_reject. The subnet and timestamp are set once,
+    so the parser can be fed line by line, e.g. by the asyncio engine.
+    """
+    subnet = scope.split()[0]
+    timestamp = timestamp or datetime.now()
+    match_lease = LEASE_PATTERN.match
+
+    def parse(line: str) -> Optional[Lease]:
+        # Skip the header and footer lines early
+        if not line.startswith("1"):
+            return None
+        match = match_lease(line)
+        if match is not None:
+            return _to_lease(match, subnet, timestamp)
+        if on_reject is not None:
+            on_reject(line)
+        return None
+
+    return parse
+
+
+def iter_leases(lines: Iterable[str], scope: str, timestamp: Optional[datetime] = None, on_reject: Optional[Callable[[str], None]] = None) -> Iterator[Lease]:
+    """
+    Parse the netsh output of a scope line by line, as it is being read. Lines that
+    look like a lease but do not match the lease pattern are passed to on_reject.
+    """
+    parse = lease_parser(scope, timestamp, on_reject)
+    for line in lines:
+        lease = parse(line)
+        if lease is not None:
+            yield lease
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/parsers/dns.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This is the parser for the JSON output of the PowerShell DNS scripts.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+__all__ = ["dns_record_parser", "iter_dns_records", "forward_record_to_row", "reverse_record_to_row"]
+
+
+def dns_record_parser(on_reject: Optional[Callable[[str], None]] = None) -> Callable[[str], Optional[Dict[str, Any]]]:
+    """
+    Create a parser of the JSON-lines output. It returns the record of a line, or
+    None for the empty lines. If on_reject is given, the lines that can not be
+    decoded are passed to it and None is returned, otherwise they raise.
+    """
+    decode = json.loads
+
+    def parse(line: str) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return decode(line)
+        except ValueError:
+            if on_reject is None:
+                raise
+            on_reject(line)
+            return None
+
+    return parse
+
+
+def iter_dns_records(lines: Iterable[str], json_lines: bool = True, on_reject: Optional[Callable[[str], None]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse the PowerShell output into DNS records. In JSON-lines mode every line is
+    a compressed JSON object and it is parsed as soon as it is read. Otherwise the
+    whole output is a single JSON document that is parsed at the end, an empty output
+    is an error since an empty zone is printed as "[]". If on_reject is given, the
+    JSON-lines that can not be decoded are passed to it and skipped.
+    """
+    if not json_lines:
+        document = json.loads("".join(lines))
+        # ConvertTo-Json emits a single object instead of a list for one record
+        yield from [document] if isinstance(document, dict) else document
+        return
+
+    parse = dns_record_parser(on_reject)
+    for line in lines:
+        record = parse(line)
+        if record is not None:
+            yield record
+
+
+def forward_record_to_row(record: Dict[str, Any], timestamp: datetime) -> Dict[str, Any]:
+    """Convert a forward lookup zone record to a DNS table row."""
+    return {
+        "name": record.get("Name", "").strip(),
+        "hostname": record.get("Hostname", "").strip(),
+        "record_type": record.get("Type", "").strip(),
+        "data": str(record.get("Data", "")).strip(),
+        "timestamp": timestamp,
+    }
+
+
+def reverse_record_to_row(record: Dict[str, Any], zone: str, dns_zone: str, timestamp: datetime) -> Dict[str, Any]:
+    """
+    Convert a reverse lookup zone record to a DNS table row. The hostname and data
+    are swapped, so the row holds the hostname and the full IP address.
+    """
+    hostname = record.get("Hostname", "").strip()
+    data = str(record.get("Data", "")).strip()
+
+    # Reverse the IP address dynamically
+    reversed_ip = ".".join(reversed(zone[:-13].split(".")))
+
+    # Remove the trailing forward zone name from the data
+    if data.lower().endswith(f".{dns_zone.lower()}."):
+        data = data[:-len(dns_zone) - 2]
+
+    return {
+        "name": record.get("Name", "").strip(),
+        "hostname": data,
+        "record_type": record.get("Type", "").strip(),
+        "data": f"{reversed_ip}.{hostname}",
+        "timestamp": timestamp,
+    }
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/powershell.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes a pool of long-lived PowerShell processes, so the DNS
+# queries don't pay the PowerShell startup and module import cost every time.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import base64
+import functools
+import json
+import queue
+import subprocess
+import threading
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from importlib import resources
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable, Iterator, List
+
+__all__ = ["DNS_RECORDS_SCRIPT", "load_script", "build_script", "PowerShellWorker", "PowerShellPool", "PowerShellException"]
+
+
+# The versioned script resource used for the DNS queries
+DNS_RECORDS_SCRIPT = "dns_records.v1.ps1"
+
+# The number of output lines read from a worker per thread hop of the asyncio engine
+ASYNC_READ_LINES = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def load_script(name: str) -> str:
+    """Load a PowerShell script from the scripts resource directory."""
+    return resources.files("clientparser").joinpath("scripts", name).read_text(encoding="utf-8")
+
+
+def _format_argument(value: Any) -> str:
+    """Format a Python value as a PowerShell argument literal."""
+    if isinstance(value, bool):
+        return "$true" if value else "$false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return f"@({', '.join(_format_argument(item) for item in value)})"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_script(name: str, **parameters: Any) -> str:
+    """Build a command that invokes a script resource as a script block with the given parameters."""
+    arguments = " ".join(f"-{parameter}:{_format_argument(value)}" for parameter, value in parameters.items())
+    return f"& {{\n{load_script(name)}\n}} {arguments}"
+
+
+class PowerShellException(Exception):
+    """Custom exception class for errors reported by a PowerShell worker."""
+
+    def __init__(self, message) -> None:
+        self.message = message
+        super(PowerShellException, self).__init__(self.message)
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class PowerShellWorker:
+    """
+    A persistent PowerShell process that reads commands from stdin. Every script is
+    sent as a single line and its output is framed by JSON lines that mark the start
+    and the end of the reply. The end frame reports any error raised by the script.
+    """
+
+    def __init__(self, executable: str = "powershell", modules: Iterable[str] = ("DnsServer",)) -> None:
+        self.process = subprocess.Popen(
+            [executable, "-NoLogo", "-NoProfile", "-NonInteractive", "-NoExit", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+
+        # Load the modules once for the lifetime of the worker
+        for module in modules:
+            with self.stream(f"Import-Module {module}") as lines:
+                for _ in lines:
+                    pass
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    @contextmanager
+    def stream(self, script: str) -> Iterator[Iterator[str]]:
+        """Run a script on the worker and provide an iterator over its output lines until the end frame."""
+        frame_id = uuid.uuid4().hex
+        frame_prefix = f'{{"__frame__":"{frame_id}"'
+        encoded_script = base64.b64encode(script.encode("utf-8")).decode("ascii")
+
+        # Decode and run the script between the begin and end frames
+        command = (
+            f"Write-Output '{frame_prefix},\"status\":\"begin\"}}'; "
+            f"try {{ Invoke-Expression ([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{encoded_script}'))); "
+            f"Write-Output '{frame_prefix},\"status\":\"ok\"}}' }} "
+            f"catch {{ Write-Output ('{frame_prefix},\"status\":\"error\",\"message\":' + ($_.Exception.Message | ConvertTo-Json -Compress) + '}}') }}\n"
+        )
+        self.process.stdin.write(command)
+        self.process.stdin.flush()
+
+        def lines() -> Iterator[str]:
+            started = False
+            for line in self.process.stdout:
+                if line.startswith(frame_prefix):
+                    frame = json.loads(line)
+                    if frame["status"] == "begin":
+                        started = True
+                        continue
+                    if frame["status"] != "ok":
+                        raise PowerShellException(f"PowerShell error: {frame.get('message')}")
+                    return
+                # Skip anything printed by the shell before the reply starts
+                if started:
+                    yield line
+            raise PowerShellException("PowerShell worker exited before the end of the reply")
+
+        yield lines()
+
+    def close(self) -> None:
+        """Stop the PowerShell process."""
+        if self.alive:
+            try:
+                self.process.stdin.write("exit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process.stdin.close()
+        self.process.stdout.close()
+
+
+class PowerShellPool:
+    """
+    A pool of persistent PowerShell workers. The workers are started on demand, up
+    to the pool size, and a worker is discarded if its reply is not fully consumed.
+    """
+
+    def __init__(self, size: int, executable: str = "powershell") -> None:
+        self.size = size
+        self.executable = executable
+        self._idle_workers: queue.Queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._workers: List[PowerShellWorker] = []
+
+    def _acquire(self) -> PowerShellWorker:
+        """Get an idle worker or start a new one."""
+        self._slots.acquire()
+        try:
+            worker = self._idle_workers.get_nowait()
+            if worker.alive:
+                return worker
+            self._discard(worker)
+        except queue.Empty:
+            pass
+
+        try:
+            worker = PowerShellWorker(executable=self.executable)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _discard(self, worker: PowerShellWorker) -> None:
+        """Stop a worker and remove it from the pool."""
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.close()
+
+    @contextmanager
+    def stream(self, script: str) -> Iterator[Iterator[str]]:
+        """Run a script on a pool worker and provide an iterator over its output lines."""
+        worker = self._acquire()
+        try:
+            with worker.stream(script) as lines:
+                yield lines
+                # Make sure the whole reply is consumed before the worker is reused
+                for _ in lines:
+                    pass
+        except BaseException:
+            self._discard(worker)
+            self._slots.release()
+            raise
+        self._idle_workers.put(worker)
+        self._slots.release()
+
+    @asynccontextmanager
+    async def astream(self, script: str) -> AsyncIterator[AsyncIterator[str]]:
+        """
+        Run a script on a pool worker from the event loop. The worker is acquired and
+        read in a thread, a chunk of lines at a time, so the loop is never blocked.
+        """
+        context = self.stream(script)
+        lines = await asyncio.to_thread(context.__enter__)
+
+        async def async_lines() -> AsyncIterator[str]:
+            while True:
+                chunk = await asyncio.to_thread(list, islice(lines, ASYNC_READ_LINES))
+                if not chunk:
+                    return
+                for line in chunk:
+                    yield line
+
+        try:
+            yield async_lines()
+        except BaseException as e:
+            # The worker is discarded, the exception is raised again
+            await asyncio.to_thread(context.__exit__, type(e), e, e.__traceback__)
+            raise
+        await asyncio.to_thread(context.__exit__, None, None, None)
+
+    def close(self) -> None:
+        """Stop all the workers of the pool."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
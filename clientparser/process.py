@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/process.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the helpers used to run the external commands (netsh and
+# PowerShell) and consume their output while they are still running.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import locale
+import subprocess
+import tempfile
+from contextlib import asynccontextmanager, contextmanager
+from typing import IO, AsyncIterator, Iterator, List
+
+__all__ = ["stream_lines", "astream_lines", "CommandException"]
+
+# Maximum length of a single output line read by the asyncio streams
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def _check_returncode(command: List[str], returncode: int, stderr: IO[bytes]) -> None:
+    """Raise an exception with the captured stderr if the command failed."""
+    if returncode == 0:
+        return
+    stderr.seek(0)
+    message = stderr.read().decode(locale.getpreferredencoding(False), errors="replace").strip()
+    raise CommandException(f"{command[0]} exited with code {returncode}: {message or 'no error output'}")
+
+
+@contextmanager
+def stream_lines(command: List[str]) -> Iterator[Iterator[str]]:
+    """
+    Start the command and provide an iterator over its stdout lines as they are
+    written by the child process. The process is killed if the consumer fails
+    before the end of the output. If the command exits with an error, the iterator
+    raises at the end of the output, before the consumer can store the lines, so a
+    failed command is never read as an empty output.
+    """
+    # The stderr is written to a file, a pipe could fill up and block the command
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, text=True, bufsize=1)
+
+        def lines() -> Iterator[str]:
+            yield from process.stdout
+            _check_returncode(command, process.wait(), stderr)
+
+        try:
+            yield lines()
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            process.wait()
+
+
+@asynccontextmanager
+async def astream_lines(command: List[str]) -> AsyncIterator[AsyncIterator[str]]:
+    """
+    Start the command as an asyncio subprocess and provide an async iterator over
+    its stdout lines as they are written by the child process. If the command exits
+    with an error, the iterator raises at the end of the output.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=stderr, limit=STREAM_LINE_LIMIT)
+        encoding = locale.getpreferredencoding(False)
+
+        async def lines() -> AsyncIterator[str]:
+            async for line in process.stdout:
+                yield line.decode(encoding, errors="replace")
+            _check_returncode(command, await process.wait(), stderr)
+
+        try:
+            yield lines()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            raise
+        finally:
+            await process.wait()
+
+
+class CommandException(Exception):
+    """Custom exception class for the commands that exit with an error."""
+
+    def __init__(self, message) -> None:
+        self.message = message
+        super(CommandException, self).__init__(self.message)
+
+    def __str__(self) -> str:
+        return self.message
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/profiling.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the profiler of the collection cycles. A cycle, or every
+# Nth cycle in interval mode, is profiled with cProfile or tracemalloc and the
+# results are written to files named after the start time of the cycle.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+__all__ = ["CycleProfiler"]
+
+
+class CycleProfiler:
+    """
+    Profile the collection cycles. The modes are:
+        - cpu: cProfile, written as a .prof file for pstats, snakeviz etc.
+        - memory: tracemalloc, the largest allocations are written as a .json file
+    Before Python 3.12 cProfile only sees the thread it was enabled in, so every
+    collector task gets its own profiler and they are merged at the end of the
+    cycle. From Python 3.12 a single profiler sees all the threads.
+    """
+
+    modes = ("cpu", "memory")
+
+    def __init__(self, mode: Optional[str] = None, every: int = 1, output_dir: str = "profiles", top: int = 50) -> None:
+        if mode is not None and mode not in self.modes:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.every = max(every, 1)
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.cycles = 0
+        self._lock = threading.Lock()
+        self._active = False
+        self._task_profiles: List[cProfile.Profile] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    @property
+    def _profile_tasks(self) -> bool:
+        """Whether the collector tasks need their own cProfile profilers."""
+        return self._active and self.mode == "cpu" and sys.version_info < (3, 12)
+
+    @contextmanager
+    def cycle(self) -> Iterator[Optional[Path]]:
+        """Profile the cycle in this block if it is one of every Nth cycles. Provides the path of the results."""
+        if not self.enabled:
+            yield None
+            return
+
+        self.cycles += 1
+        if (self.cycles - 1) % self.every != 0:
+            yield None
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"cycle-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{self.cycles}.{'prof' if self.mode == 'cpu' else 'json'}"
+        if self.mode == "cpu":
+            with self._profile_cpu(path):
+                yield path
+        else:
+            with self._profile_memory(path):
+                yield path
+
+    @contextmanager
+    def task(self) -> Iterator[None]:
+        """Profile a collector task that runs on a worker thread, while a cycle is profiled."""
+        if not self._profile_tasks:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._task_profiles.append(profile)
+
+    @contextmanager
+    def _profile_cpu(self, path: Path) -> Iterator[None]:
+        self._task_profiles = []
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active = False
+
+            # Merge the profiles of the collector tasks into the profile of the cycle
+            stats = pstats.Stats(profile)
+            with self._lock:
+                for task_profile in self._task_profiles:
+                    stats.add(task_profile)
+                self._task_profiles = []
+            stats.dump_stats(path)
+
+    @contextmanager
+    def _profile_memory(self, path: Path) -> Iterator[None]:
+        # tracemalloc follows the allocations of all threads
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+
+            snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            results = {
+                "current_kb": current // 1024,
+                "peak_kb": peak // 1024,
+                "top_lines": [
+                    {"file": statistic.traceback[0].filename, "line": statistic.traceback[0].lineno, "size_kb": statistic.size // 1024, "count": statistic.count}
+                    for statistic in snapshot.statistics("lineno")[:self.top]
+                ],
+                "top_tracebacks": [
+                    {"size_kb": statistic.size // 1024, "count": statistic.count, "traceback": statistic.traceback.format()}
+                    for statistic in snapshot.statistics("traceback")[:10]
+                ],
+            }
+            path.write_text(json.dumps(results, indent=2), encoding="utf-8")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/runners.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the command runners used by the collectors. The subprocess
+# runner runs netsh and PowerShell, while the replay, recording and synthetic
+# runners make the pipeline testable without the DHCP and DNS servers.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import re
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, NamedTuple, Optional, Tuple
+
+from clientparser.config import Config
+from clientparser.powershell import PowerShellPool
+from clientparser.process import astream_lines, stream_lines
+from clientparser.synthetic import dns_forward_output, dns_reverse_output, netsh_output
+
+__all__ = ["Command", "CommandRunner", "SubprocessRunner", "ReplayRunner", "RecordingRunner", "SyntheticRunner", "create_runner"]
+
+
+class Command(NamedTuple):
+    """A command run by a collector."""
+    # The kind of the command: "dhcp", "dns_forward" or "dns_reverse"
+    kind: str
+    # The DHCP scopes or DNS zones queried by the command
+    targets: Tuple[str, ...]
+    # The command line arguments
+    args: List[str]
+    # The PowerShell script of the command, if any
+    script: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """A file name friendly identifier of the command, used for the fixtures."""
+        target = self.targets[0] if len(self.targets) == 1 else "batch"
+        return re.sub(r"[^\w.-]", "_", f"{self.kind}_{target}")
+
+
+class CommandRunner:
+    """Base class of the command runners. A runner provides the output lines of a command."""
+
+    def stream(self, command: Command) -> Iterator[Iterator[str]]:
+        """Provide an iterator over the output lines of the command."""
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def astream(self, command: Command) -> AsyncIterator[AsyncIterator[str]]:
+        """Provide an async iterator over the output lines of the command."""
+        with self.stream(command) as lines:
+            async def async_lines() -> AsyncIterator[str]:
+                for line in lines:
+                    yield line
+            yield async_lines()
+
+    def close(self) -> None:
+        """Release the resources of the runner."""
+
+
+class SubprocessRunner(CommandRunner):
+    """Run the commands as child processes, or on the persistent PowerShell pool if one is given."""
+
+    def __init__(self, powershell_pool: Optional[PowerShellPool] = None) -> None:
+        self.powershell_pool = powershell_pool
+
+    def stream(self, command: Command):
+        if self.powershell_pool is not None and command.script is not None:
+            return self.powershell_pool.stream(command.script)
+        return stream_lines(command.args)
+
+    def astream(self, command: Command):
+        if self.powershell_pool is not None and command.script is not None:
+            return self.powershell_pool.astream(command.script)
+        return astream_lines(command.args)
+
+    def close(self) -> None:
+        if self.powershell_pool is not None:
+            self.powershell_pool.close()
+
+
+class ReplayRunner(CommandRunner):
+    """Serve the recorded output of every command from a fixture file named after the command."""
+
+    def __init__(self, fixture_dir: str) -> None:
+        self.fixture_dir = Path(fixture_dir)
+
+    @contextmanager
+    def stream(self, command: Command) -> Iterator[Iterator[str]]:
+        fixture_path = self.fixture_dir / f"{command.name}.txt"
+        if not fixture_path.is_file():
+            raise RuntimeError(f"No recorded output for {command.name} in {self.fixture_dir}")
+        with open(fixture_path, encoding="utf-8") as fixture:
+            yield iter(fixture)
+
+
+class RecordingRunner(CommandRunner):
+    """Wrap another runner and save the output of every command to a fixture file, for the replay runner."""
+
+    def __init__(self, runner: CommandRunner, fixture_dir: str) -> None:
+        self.runner = runner
+        self.fixture_dir = Path(fixture_dir)
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stream(self, command: Command) -> Iterator[Iterator[str]]:
+        with self.runner.stream(command) as lines, open(self.fixture_dir / f"{command.name}.txt", "w", encoding="utf-8") as fixture:
+            def recorded_lines() -> Iterator[str]:
+                for line in lines:
+                    fixture.write(line)
+                    yield line
+            yield recorded_lines()
+
+    @asynccontextmanager
+    async def astream(self, command: Command) -> AsyncIterator[AsyncIterator[str]]:
+        async with self.runner.astream(command) as lines:
+            with open(self.fixture_dir / f"{command.name}.txt", "w", encoding="utf-8") as fixture:
+                async def recorded_lines() -> AsyncIterator[str]:
+                    async for line in lines:
+                        fixture.write(line)
+                        yield line
+                yield recorded_lines()
+
+    def close(self) -> None:
+        self.runner.close()
+
+
+class SyntheticRunner(CommandRunner):
+    """Generate realistic outputs with a fixed number of leases per scope and records per zone."""
+
+    def __init__(self, leases_per_scope: int, records_per_zone: int, dns_zone: str, json_lines: bool = True, seed: int = 0) -> None:
+        self.leases_per_scope = leases_per_scope
+        self.records_per_zone = records_per_zone
+        self.dns_zone = dns_zone
+        self.json_lines = json_lines
+        self.seed = seed
+
+    @contextmanager
+    def stream(self, command: Command) -> Iterator[Iterator[str]]:
+        if command.kind == "dhcp":
+            yield netsh_output(command.targets[0], self.leases_per_scope, seed=self.seed)
+        elif command.kind == "dns_forward":
+            yield dns_forward_output(command.targets[0], self.records_per_zone, json_lines=self.json_lines, seed=self.seed)
+        else:
+            # The batched reverse lookup zones are always printed as JSON-lines
+            json_lines = self.json_lines or len(command.targets) > 1
+            yield dns_reverse_output(list(command.targets), self.records_per_zone, self.dns_zone, json_lines=json_lines, seed=self.seed)
+
+
+def create_runner(config: Config) -> CommandRunner:
+    """Create the command runner selected in the configuration."""
+    powershell_pool = None
+    if config.powershell_pool_size > 0 and config.command_runner in ("subprocess", "record"):
+        powershell_pool = PowerShellPool(size=config.powershell_pool_size, executable=config.powershell_executable)
+
+    if config.command_runner == "subprocess":
+        return SubprocessRunner(powershell_pool=powershell_pool)
+    if config.command_runner == "record":
+        return RecordingRunner(SubprocessRunner(powershell_pool=powershell_pool), fixture_dir=config.fixture_dir)
+    if config.command_runner == "replay":
+        return ReplayRunner(fixture_dir=config.fixture_dir)
+    if config.command_runner == "synthetic":
+        return SyntheticRunner(config.synthetic_leases, config.synthetic_records, config.dns_zone, json_lines=config.dns_json_lines)
+    raise ValueError(f"Unknown command runner: {config.command_runner}")
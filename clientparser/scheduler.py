@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/scheduler.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the scheduler of the interval mode. The cycles start on
+# fixed boundaries of the interval, measured with the monotonic clock, so the
+# sample times do not drift with the runtime of the cycles.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import threading
+import time
+from typing import Callable, Optional
+
+__all__ = ["Scheduler"]
+
+
+class Scheduler:
+    """
+    Run a job on fixed cadence boundaries. The first run is aligned to a multiple of
+    the interval on the wall clock, e.g. :00, :05, :10 for 5 minutes, and the next
+    deadlines are kept on the monotonic clock. A job that runs past the next deadline
+    is an overrun, handled with one of the following policies:
+        - skip: drop the missed deadlines and wait for the next boundary
+        - catch-up: start the missed runs right away, one after the other
+    """
+
+    policies = ("skip", "catch-up")
+
+    def __init__(self, interval: float, overrun: str = "skip", clock: Callable[[], float] = time.monotonic) -> None:
+        if interval <= 0:
+            raise ValueError("The interval must be greater than 0")
+        if overrun not in self.policies:
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+        self.interval = interval
+        self.overrun = overrun
+        self.clock = clock
+        self.skipped = 0
+        # The wall clock time of the boundary of the current deadline
+        self.boundary = 0.0
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Stop the scheduler, it returns once the running job is done."""
+        self._stop.set()
+
+    def first_deadline(self) -> float:
+        """The first deadline on the monotonic clock, aligned to the interval on the wall clock."""
+        wall_time = time.time()
+        self.boundary = (wall_time // self.interval + 1) * self.interval
+        return self.clock() + (self.boundary - wall_time)
+
+    def next_deadline(self, deadline: float) -> float:
+        """The deadline after a run that was due at the given deadline, according to the overrun policy."""
+        next_deadline = deadline + self.interval
+        self.boundary += self.interval
+        now = self.clock()
+        if now < next_deadline or self.overrun == "catch-up":
+            return next_deadline
+
+        # Skip the missed deadlines and keep the cadence
+        missed = int((now - next_deadline) // self.interval) + 1
+        self.skipped += missed
+        self.boundary += missed * self.interval
+        return next_deadline + missed * self.interval
+
+    def run(self, job: Callable[[float], None], on_wait: Optional[Callable[[float], None]] = None, on_skip: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Run the job on every deadline until the scheduler is stopped. The job gets the
+        wall clock time of the boundary it runs for. Exceptions of the job stop the scheduler.
+        """
+        deadline = self.first_deadline()
+        while not self._stop.is_set():
+            # Sleep until the deadline, a stop request wakes the scheduler up
+            delay = deadline - self.clock()
+            if delay > 0:
+                if on_wait is not None:
+                    on_wait(delay)
+                if self._stop.wait(delay):
+                    break
+
+            job(self.boundary)
+
+            skipped = self.skipped
+            deadline = self.next_deadline(deadline)
+            if on_skip is not None and self.skipped > skipped:
+                on_skip(self.skipped - skipped)
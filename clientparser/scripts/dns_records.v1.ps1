@@ -0,0 +1,76 @@
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/scripts/dns_records.v1.ps1
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This script prints the resource records of one or more DNS zones. Only the fields
+# used by the Client Parser are projected on the server side and every record is
+# written as a compressed JSON line tagged with its zone name.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+param(
+    [string]$ServerName,
+    [string[]]$ZoneNames,
+    # Only the records of these types are printed, all the types if empty
+    [string[]]$RecordTypes = @(),
+    # Query the zones in parallel runspaces (PowerShell 7+) if greater than 0
+    [int]$ThrottleLimit = 0,
+    # Print all the records as a single JSON document instead of JSON lines
+    [switch]$Document
+)
+
+# Fail on any error, so a zone that can not be read is not reported as an empty zone
+$ErrorActionPreference = 'Stop'
+
+# Run this same script for every zone in a parallel runspace
+if ($ThrottleLimit -gt 0 -and $ZoneNames.Count -gt 1) {
+    $scriptText = $MyInvocation.MyCommand.ScriptBlock.ToString()
+    $ZoneNames | ForEach-Object -ThrottleLimit $ThrottleLimit -Parallel {
+        & ([scriptblock]::Create($using:scriptText)) -ServerName $using:ServerName -ZoneNames $_ -RecordTypes $using:RecordTypes
+    }
+    return
+}
+
+function Get-ZoneRecords([string]$zoneName) {
+    # Project only the fields used by the Client Parser
+    $projection = @(
+        @{ Name = 'Name'; Expression = { $zoneName } },
+        @{ Name = 'Hostname'; Expression = { $_.HostName } },
+        @{ Name = 'Type'; Expression = { $_.RecordType } },
+        @{ Name = 'Data'; Expression = {
+            # Inside the switch $_ is the record type, so the record is bound first
+            $record = $_
+            switch ($record.RecordType) {
+                'A'         { $record.RecordData.IPv4Address.IPAddressToString }
+                'AAAA'      { $record.RecordData.IPv6Address.IPAddressToString }
+                'CNAME'     { $record.RecordData.HostNameAlias }
+                'MX'        { $record.RecordData.MailExchange }
+                'NS'        { $record.RecordData.NameServer }
+                'PTR'       { $record.RecordData.PtrDomainName }
+                'SRV'       { "$($record.RecordData.Target) $($record.RecordData.Port)" }
+                'TXT'       { -join $record.RecordData.DescriptiveText }
+                default     { $null }
+            }
+        } }
+    )
+
+    Get-DnsServerResourceRecord -ComputerName $ServerName -ZoneName $zoneName |
+        Where-Object { $RecordTypes.Count -eq 0 -or $RecordTypes -contains $_.RecordType } |
+        Select-Object -Property $projection
+}
+
+if ($Document) {
+    $records = foreach ($zoneName in $ZoneNames) { Get-ZoneRecords $zoneName }
+    ConvertTo-Json -InputObject @($records) -Compress
+    return
+}
+
+# Write every record as soon as it is projected
+foreach ($zoneName in $ZoneNames) {
+    Get-ZoneRecords $zoneName | ForEach-Object { $_ | ConvertTo-Json -Compress }
+}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/sync.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module computes the differences between two snapshots of the DHCP or DNS
+# rows, so only the changes are written to the database in incremental mode.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+__all__ = ["DHCP_KEY", "DNS_KEY", "Delta", "build_snapshot", "iter_snapshot", "diff_snapshots"]
+
+
+# The columns that identify a row in each snapshot
+DHCP_KEY = ("mac_address",)
+DNS_KEY = ("hostname", "record_type", "data")
+
+# The columns that are not compared when looking for updated rows
+IGNORED_COLUMNS = ("id", "timestamp")
+
+Snapshot = Dict[Tuple[Any, ...], Dict[str, Any]]
+
+
+class Delta(NamedTuple):
+    """The rows to insert, update and delete to go from one snapshot to the next."""
+    inserts: List[Dict[str, Any]]
+    updates: List[Dict[str, Any]]
+    deletes: List[Dict[str, Any]]
+
+    def __bool__(self) -> bool:
+        return bool(self.inserts or self.updates or self.deletes)
+
+
+def build_snapshot(rows: Iterable[Dict[str, Any]], key_columns: Tuple[str, ...]) -> Snapshot:
+    """Build a snapshot of the rows keyed by the key columns. Duplicate keys keep the last row."""
+    return {tuple(row[column] for column in key_columns): row for row in rows}
+
+
+def iter_snapshot(rows: Iterable[Dict[str, Any]], key_columns: Tuple[str, ...], snapshot: Snapshot) -> Iterator[Dict[str, Any]]:
+    """Yield the rows while adding them to a snapshot, so the rows can be streamed and diffed."""
+    for row in rows:
+        snapshot[tuple(row[column] for column in key_columns)] = row
+        yield row
+
+
+def _changed(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    """Check if any of the compared columns of a row have changed."""
+    return any(previous.get(column) != value for column, value in current.items() if column not in IGNORED_COLUMNS)
+
+
+def diff_snapshots(previous: Snapshot, current: Snapshot) -> Delta:
+    """
+    Compute the delta between two snapshots. Rows that only differ in their
+    timestamp are considered unchanged, so they keep their previous timestamp.
+    """
+    inserts = [row for key, row in current.items() if key not in previous]
+    updates = [row for key, row in current.items() if key in previous and _changed(previous[key], row)]
+    deletes = [row for key, row in previous.items() if key not in current]
+    return Delta(inserts=inserts, updates=updates, deletes=deletes)
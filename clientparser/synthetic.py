@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/synthetic.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module generates synthetic netsh and PowerShell outputs with realistic
+# formats, so the whole pipeline can be tested and benchmarked without access to
+# the DHCP and DNS servers.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import ipaddress
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+__all__ = ["netsh_output", "dns_forward_output", "dns_reverse_output"]
+
+
+def _format_expiry(expires: datetime) -> str:
+    """Format a lease expiry date like netsh does, e.g. 3/20/2025 4:12:05 PM."""
+    hour = expires.hour % 12 or 12
+    return f"{expires.month}/{expires.day}/{expires.year} {hour}:{expires.minute:02d}:{expires.second:02d} {'PM' if expires.hour >= 12 else 'AM'}"
+
+
+def netsh_output(scope: str, count: int, seed: int = 0) -> Iterator[str]:
+    """Generate the "netsh dhcp server ... show clients 1" output of a scope with the given number of leases."""
+    generator = random.Random(f"{seed}-{scope}")
+    network = int(ipaddress.IPv4Address(scope))
+    expires = datetime(2025, 3, 20, 16, 12, 5)
+
+    yield "\n"
+    yield f"Changed the current scope context to {scope} scope.\n"
+    yield "\n"
+    yield "Type : N - NAP Capable, R - Reservation, U - Unknown, D - DNS Dynamic, E - DNS Dynamic Enabled\n"
+    yield "IP Address      - Subnet Mask    - Unique ID           - Lease Expires         -Type- Name\n"
+    yield "=================================================================================\n"
+
+    for index in range(count):
+        ip_address = str(ipaddress.IPv4Address(network + index + 1))
+        mac_address = "-".join(f"{byte:02x}" for byte in (network + index).to_bytes(4, "big") + generator.randbytes(2))
+        lease_type = generator.choice("DDDDUN")
+        hostname = f"host-{index}.example.local" if generator.random() < 0.9 else ""
+        lease_expires = generator.choice((_format_expiry(expires + timedelta(minutes=index)), "NEVER EXPIRES", "INACTIVE"))
+        yield f"{ip_address:<15} - 255.255.255.0  - {mac_address:<19} - {lease_expires:<22}-{lease_type}-  {hostname}\n"
+
+    yield "\n"
+    yield f"No of Clients(version 4): {count} in the Scope : {scope}.\n"
+    yield "\n"
+    yield "Command completed successfully.\n"
+
+
+def _dns_output(records: Iterator[dict], json_lines: bool) -> Iterator[str]:
+    """Print the records as JSON-lines or as a single JSON document, like the DNS records script."""
+    if json_lines:
+        for record in records:
+            yield json.dumps(record, separators=(",", ":")) + "\n"
+    else:
+        yield json.dumps(list(records), separators=(",", ":")) + "\n"
+
+
+def dns_forward_output(zone: str, count: int, json_lines: bool = True, seed: int = 0) -> Iterator[str]:
+    """Generate the DNS records script output of a forward lookup zone with the given number of records."""
+    generator = random.Random(f"{seed}-{zone}")
+
+    def records() -> Iterator[dict]:
+        for index in range(count):
+            record_type = generator.choice(("A", "A", "A", "A", "AAAA", "CNAME", "MX", "TXT", "SRV"))
+            data = {
+                "A": f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+                "AAAA": f"fd00::{index:x}",
+                "CNAME": f"host-{generator.randrange(max(count, 1))}.{zone}.",
+                "MX": f"mail.{zone}.",
+                "TXT": f"v=spf1 include:{zone} ~all",
+                "SRV": f"dc-{index % 4}.{zone}. 389",
+            }[record_type]
+            yield {"Name": zone, "Hostname": f"host-{index}", "Type": record_type, "Data": data}
+
+    return _dns_output(records(), json_lines)
+
+
+def dns_reverse_output(zones: List[str], count: int, dns_zone: str, json_lines: bool = True, seed: int = 0) -> Iterator[str]:
+    """Generate the DNS records script output of the reverse lookup zones with the given number of PTR records per zone."""
+
+    def records() -> Iterator[dict]:
+        for zone in zones:
+            for index in range(count):
+                hostname = f"{index & 255}.{index >> 8 & 255}" if zone.count(".") < 4 else f"{index & 255}"
+                yield {"Name": zone, "Hostname": hostname, "Type": "PTR", "Data": f"host-{seed}-{index}.{dns_zone}."}
+
+    return _dns_output(records(), json_lines)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: clientparser/types.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module includes the column types of the compact schema. The addresses are
+# stored as integers and bytes instead of text, while the rest of the application
+# still reads and writes them as strings.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import socket
+from typing import Any, Optional
+from sqlalchemy import BigInteger, VARBINARY
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
+
+__all__ = ["IPv4Address", "MACAddress"]
+
+
+class IPv4Address(TypeDecorator):
+    """
+    An IPv4 address stored as an unsigned 32-bit integer, INT UNSIGNED on MariaDB/MySQL.
+    The integers sort like the addresses, so a subnet is a range scan of the index.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Any) -> Any:
+        if dialect.name in ("mysql", "mariadb"):
+            return dialect.type_descriptor(mysql.INTEGER(unsigned=True))
+        return dialect.type_descriptor(BigInteger())
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[int]:
+        if value is None:
+            return None
+        try:
+            return int.from_bytes(socket.inet_aton(value), "big")
+        except OSError:
+            raise ValueError(f"Invalid IPv4 address: {value}")
+
+    def process_result_value(self, value: Optional[int], dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return socket.inet_ntoa(int(value).to_bytes(4, "big"))
+
+
+class MACAddress(TypeDecorator):
+    """
+    A MAC address or DHCP client identifier stored as bytes, a client identifier has up
+    to 255 bytes. The parser marks the identifiers longer than a MAC address with ":XX",
+    the marker is not stored and is added back when the value is read.
+    """
+
+    impl = VARBINARY(255)
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        if value.endswith(":XX"):
+            value = value[:-3]
+        try:
+            return bytes.fromhex(value.replace(":", ""))
+        except ValueError:
+            raise ValueError(f"Invalid MAC address: {value}")
+
+    def process_result_value(self, value: Optional[bytes], dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        mac_address = bytes(value).hex(":").upper()
+        return mac_address + ":XX" if len(value) > 6 else mac_address
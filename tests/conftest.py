@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/conftest.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# This module configures the tests. The config is read from the environment when
+# the package is imported, so the settings are set before any test module loads.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+from sqlalchemy import MetaData, Table, create_engine, select
+
+# The tests never read the .env file, and every setting read by the config is cleared,
+# so the settings of the developer can not point the tests to a real database or change
+# what is tested. The config is read when the package is imported, so this runs first.
+os.environ["CLIENTPARSER_LOAD_DOTENV"] = "false"
+CONFIG_SOURCE = (Path(__file__).resolve().parent.parent / "clientparser" / "config.py").read_text(encoding="utf-8")
+for name in re.findall(r'os\.getenv\("(\w+)"', CONFIG_SOURCE):
+    if name != "CLIENTPARSER_LOAD_DOTENV":
+        os.environ.pop(name, None)
+
+os.environ["SCOPES"] = "[10.0.1.0]"
+os.environ["DHCP_SERVER"] = "dhcp.test.local"
+os.environ["DNS_SERVER"] = "dns.test.local"
+os.environ["DNS_ZONE"] = "test.local"
+os.environ["DNS_REVERSE_ZONES"] = "[1.0.10.in-addr.arpa]"
+# A file database, the collector threads share it through the connection pool
+os.environ["DATABASE_URI"] = f"sqlite:///{Path(tempfile.mkdtemp(prefix='clientparser-tests-')) / 'tests.sqlite'}"
+
+from clientparser import ClientParser, database  # noqa: E402
+from clientparser.runners import ReplayRunner  # noqa: E402
+
+# The captured command outputs used by the tests
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def fixture_dir() -> Path:
+    return FIXTURE_DIR
+
+
+@pytest.fixture
+def replay_dir(tmp_path: Path) -> Path:
+    """A copy of the captured outputs, for the tests that change them between cycles."""
+    return Path(shutil.copytree(FIXTURE_DIR, tmp_path / "fixtures"))
+
+
+@pytest.fixture
+def empty_database() -> Iterator[None]:
+    """Start the test on an empty database, and close the connections of the application after it."""
+    engine = create_engine(os.environ["DATABASE_URI"])
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    metadata.drop_all(bind=engine)
+    engine.dispose()
+    yield
+    database.dispose_db()
+
+
+@pytest.fixture
+def client_parser(empty_database: None, replay_dir: Path) -> Iterator[ClientParser]:
+    """A client parser that replays the copy of the captured outputs on an empty database."""
+    client_parser = ClientParser(runner=ReplayRunner(str(replay_dir)))
+    yield client_parser
+    client_parser._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def run_cycle() -> Callable[[ClientParser], None]:
+    """Run a collection cycle and wait for the old tables to be dropped."""
+    def run(client_parser: ClientParser) -> None:
+        client_parser._get_data(verbose=False)
+        if client_parser._cleanup_thread is not None:
+            client_parser._cleanup_thread.join()
+    return run
+
+
+@pytest.fixture
+def table_rows() -> Callable[[Table], List[Dict[str, Any]]]:
+    """Read the rows of a table without their id and timestamp, in a stable order."""
+    def read(table: Table) -> List[Dict[str, Any]]:
+        columns = [column for column in table.columns if column.name not in ("id", "timestamp")]
+        with database.db_engine.connect() as connection:
+            rows = [dict(row) for row in connection.execute(select(*columns)).mappings()]
+        return sorted(rows, key=lambda row: [str(value) for value in row.values()])
+    return read
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_async.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the asyncio collection engine: a cycle of the captured outputs
+# writes the same rows as the threaded engine.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import asyncio
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import Table
+
+from clientparser import ClientParser
+from clientparser.database import get_dhcp_table, get_final_table, DNSModel
+
+
+def final_tables() -> List[Table]:
+    return [get_final_table(get_dhcp_table("10.0.1.0")), get_final_table(DNSModel.__table__)]
+
+
+def test_async_cycle_matches_threaded_cycle(client_parser: ClientParser, run_cycle: Callable[[ClientParser], None], table_rows: Callable[[Table], List[Dict[str, Any]]]) -> None:
+    run_cycle(client_parser)
+    expected = [table_rows(table) for table in final_tables()]
+    assert all(expected)
+
+    asyncio.run(client_parser._get_data_async(verbose=False))
+    if client_parser._cleanup_thread is not None:
+        client_parser._cleanup_thread.join()
+
+    assert [table_rows(table) for table in final_tables()] == expected
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_dhcp_parser.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests compare the lease parser with the split/strip parsing it replaced,
+# on a captured "netsh dhcp server ... show clients 1" output with edge cases.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from clientparser.parsers import lease_parser, parse_lease, parse_leases, iter_leases
+
+SCOPE = "10.0.1.0"
+TIMESTAMP = datetime(2025, 3, 20, 12, 0, 0)
+
+
+def legacy_parse(output: str, scope: str) -> List[Tuple[str, ...]]:
+    """The lease parsing of the first release, line by line with split and strip."""
+    leases = []
+    for lease in output.splitlines():
+        if lease.startswith("1"):
+            lease_parts = re.split(r"-(N|U|D)-", lease, maxsplit=1)
+            if len(lease_parts) > 1:
+                small_lease_parts = lease_parts[0].split("-")
+                ip_address = small_lease_parts[0].strip()
+                mac_address = ":".join(part.strip().upper() for part in small_lease_parts[2:-1])
+                if len(mac_address) > 17:
+                    mac_address = mac_address + ":XX"
+                lease_status = small_lease_parts[-1].strip()
+                hostname = lease_parts[2].strip().split(".")[0].lower()
+                leases.append((ip_address, mac_address, lease_status, hostname, scope.split()[0], TIMESTAMP))
+    return leases
+
+
+@pytest.fixture
+def netsh_output(fixture_dir: Path) -> str:
+    # Named after the command, so the replay runner serves it as well
+    return (fixture_dir / "dhcp_10.0.1.0.txt").read_text(encoding="utf-8")
+
+
+def test_parse_leases_matches_legacy_parsing(netsh_output: str) -> None:
+    assert parse_leases(netsh_output, SCOPE, TIMESTAMP) == legacy_parse(netsh_output, SCOPE)
+
+
+def test_iter_leases_matches_legacy_parsing(netsh_output: str) -> None:
+    lines = netsh_output.splitlines(keepends=True)
+    assert list(iter_leases(lines, SCOPE, TIMESTAMP)) == legacy_parse(netsh_output, SCOPE)
+
+
+def test_parse_lease_matches_legacy_parsing(netsh_output: str) -> None:
+    for line in netsh_output.splitlines():
+        expected = legacy_parse(line, SCOPE)
+        assert parse_lease(line, SCOPE, TIMESTAMP) == (expected[0] if expected else None)
+
+
+def test_edge_cases(netsh_output: str) -> None:
+    leases = {lease[0]: lease for lease in parse_leases(netsh_output, SCOPE, TIMESTAMP)}
+    # The client IDs longer than a MAC address are marked with ":XX"
+    assert leases["10.0.1.12"][1] == "01:00:15:5D:01:02:05:AA:XX"
+    assert leases["10.0.1.13"][1] == "01:00:15:5D:01:02:06:BB:CC:DD:EE:FF:XX"
+    # The lease status and the empty hostnames
+    assert leases["10.0.1.11"][2] == "NEVER EXPIRES"
+    assert leases["10.0.1.12"][2:4] == ("INACTIVE", "")
+    assert leases["10.0.1.15"][2:4] == ("INACTIVE", "")
+    # The extra spaces are stripped and the hostname loses its domain
+    assert leases["10.0.1.14"][:4] == ("10.0.1.14", "AA:BB:CC:DD:EE:FF", "3/22/2025 1:00:00 AM", "spaced-host")
+    assert leases["10.0.1.11"][3] == "pc-d-02"
+    assert len(leases) == 7
+
+
+def test_lease_parser_matches_parse_leases(netsh_output: str) -> None:
+    parse = lease_parser(SCOPE, TIMESTAMP)
+    leases = [parse(line) for line in netsh_output.splitlines(keepends=True)]
+    assert [lease for lease in leases if lease is not None] == parse_leases(netsh_output, SCOPE, TIMESTAMP)
+
+
+def test_iter_leases_rejects_malformed_lines() -> None:
+    rejected = []
+    lines = ["10.0.1.20 - 255.255.255.0 - truncated line\n", "No of Clients(version 4): 1 in the Scope : 10.0.1.0.\n"]
+    assert list(iter_leases(lines, SCOPE, TIMESTAMP, on_reject=rejected.append)) == []
+    assert rejected == [lines[0]]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_dispatcher.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the dispatcher of the collection tasks: several servers share an
+# executor, and neither the limit of a server nor the executor threads are exceeded.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict
+
+from clientparser.dispatcher import ServerDispatcher
+
+EXECUTOR_WORKERS = 4
+SERVER_LIMIT = 2
+SERVERS = ("dhcp", "dns-1", "dns-2")
+TASKS_PER_SERVER = 8
+
+
+class Tracker:
+    """Track the running tasks of every server, and the most that ran at once."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.running: Dict[str, int] = {server: 0 for server in SERVERS}
+        self.max_running: Dict[str, int] = {server: 0 for server in SERVERS}
+        self.max_total = 0
+
+    def task(self, server: str) -> str:
+        with self._lock:
+            self.running[server] += 1
+            self.max_running[server] = max(self.max_running[server], self.running[server])
+            self.max_total = max(self.max_total, sum(self.running.values()))
+        time.sleep(0.01)
+        with self._lock:
+            self.running[server] -= 1
+        return server
+
+
+def test_server_limit_and_executor_slots_are_not_exceeded() -> None:
+    tracker = Tracker()
+    with ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS) as executor:
+        dispatchers = {server: ServerDispatcher(executor, SERVER_LIMIT) for server in SERVERS}
+        futures = [dispatchers[server].submit(tracker.task, server) for _ in range(TASKS_PER_SERVER) for server in SERVERS]
+        done, not_done = wait(futures, timeout=10)
+
+    assert not not_done
+    assert sorted(future.result() for future in done) == sorted(SERVERS * TASKS_PER_SERVER)
+    assert max(tracker.max_running.values()) == SERVER_LIMIT
+    assert tracker.max_total <= EXECUTOR_WORKERS
+    assert all(dispatcher._running == 0 for dispatcher in dispatchers.values())
+
+
+def test_waiting_tasks_do_not_hold_executor_threads() -> None:
+    # A slow server at its limit leaves the other executor threads to the other servers
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS) as executor:
+        slow_server = ServerDispatcher(executor, SERVER_LIMIT)
+        fast_server = ServerDispatcher(executor, SERVER_LIMIT)
+        slow_futures = [slow_server.submit(release.wait, 10) for _ in range(TASKS_PER_SERVER)]
+        fast_futures = [fast_server.submit(time.sleep, 0) for _ in range(TASKS_PER_SERVER)]
+
+        _, not_done = wait(fast_futures, timeout=5)
+        release.set()
+        wait(slow_futures, timeout=10)
+
+    assert not not_done
+    assert all(future.result() for future in slow_futures)
+
+
+def test_failed_task_frees_its_slot() -> None:
+    def fail() -> None:
+        raise ValueError("failed")
+
+    with ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS) as executor:
+        dispatcher = ServerDispatcher(executor, 1)
+        failed = dispatcher.submit(fail)
+        succeeded = dispatcher.submit(lambda: "done")
+        wait([failed, succeeded], timeout=5)
+
+    assert isinstance(failed.exception(), ValueError)
+    assert succeeded.result() == "done"
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_history.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the history of the full mode: the changes of a cycle are only
+# recorded once its tables were swapped, so a failed cycle records nothing.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pytest
+from sqlalchemy import select
+
+from clientparser import ClientParser, database
+from clientparser.history import dhcp_lease_history
+
+
+def lease_history() -> List[Tuple[str, str]]:
+    """The IP addresses and change types in the DHCP lease history."""
+    with database.db_engine.connect() as connection:
+        return sorted(connection.execute(select(dhcp_lease_history.c.ip, dhcp_lease_history.c.change_type)).all())
+
+
+def test_failed_cycle_records_no_history(client_parser: ClientParser, replay_dir: Path, run_cycle: Callable[[ClientParser], None], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(client_parser.config, "_history_enabled", True)
+    run_cycle(client_parser)
+    first_cycle = lease_history()
+    assert first_cycle and {change_type for _, change_type in first_cycle} == {"insert"}
+
+    # Remove a lease, and fail the cycle with a reverse lookup zone that has no output
+    dhcp_path = replay_dir / "dhcp_10.0.1.0.txt"
+    dhcp_lines = dhcp_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    dhcp_path.write_text("".join(line for line in dhcp_lines if not line.startswith("10.0.1.16")), encoding="utf-8")
+    reverse_path = replay_dir / "dns_reverse_1.0.10.in-addr.arpa.txt"
+    reverse_output = reverse_path.read_text(encoding="utf-8")
+    reverse_path.unlink()
+
+    with pytest.raises(RuntimeError):
+        run_cycle(client_parser)
+    assert lease_history() == first_cycle
+
+    # The next cycle records the deleted lease once
+    reverse_path.write_text(reverse_output, encoding="utf-8")
+    run_cycle(client_parser)
+    assert lease_history() == sorted(first_cycle + [("10.0.1.16", "delete")])
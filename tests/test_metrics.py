@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_metrics.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the instrumentation of the collection cycles: the collect timer
+# only counts the time spent in the command runner, and the threaded and asyncio
+# engines count the same rows for a replayed cycle.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, List
+
+from clientparser import ClientParser
+from clientparser.metrics import CycleMetrics, Instrumentation, MetricsSink
+from clientparser.runners import ReplayRunner
+
+CONSUMER_SECONDS = 0.05
+
+
+class CapturingSink(MetricsSink):
+    """Keep the metrics of every cycle."""
+
+    def __init__(self) -> None:
+        self.cycles: List[CycleMetrics] = []
+
+    def emit(self, metrics: CycleMetrics) -> None:
+        self.cycles.append(metrics)
+
+
+def timer_seconds(metrics: CycleMetrics, name: str) -> float:
+    return sum(timing.seconds for (timer_name, _), timing in metrics.timers.items() if timer_name == name)
+
+
+def test_stream_timer_excludes_the_consumer() -> None:
+    sink = CapturingSink()
+    instrumentation = Instrumentation([sink])
+
+    @contextmanager
+    def stream() -> Iterator[Iterator[str]]:
+        yield iter(["a", "b", "c"])
+
+    with instrumentation.stream_timer(stream(), "collect", source="10.0.1.0") as lines:
+        for _ in lines:
+            # The rows are written to the database
+            time.sleep(CONSUMER_SECONDS)
+    metrics = instrumentation.emit()
+
+    assert metrics.timers[("collect", (("source", "10.0.1.0"),))].count == 1
+    assert timer_seconds(metrics, "collect") < CONSUMER_SECONDS
+
+
+def test_astream_timer_excludes_the_consumer() -> None:
+    instrumentation = Instrumentation([CapturingSink()])
+
+    @asynccontextmanager
+    async def stream() -> AsyncIterator[AsyncIterator[str]]:
+        async def lines() -> AsyncIterator[str]:
+            for line in ("a", "b", "c"):
+                yield line
+        yield lines()
+
+    async def consume() -> List[str]:
+        consumed = []
+        async with instrumentation.astream_timer(stream(), "collect", source="10.0.1.0") as lines:
+            async for line in lines:
+                await asyncio.sleep(CONSUMER_SECONDS)
+                consumed.append(line)
+        return consumed
+
+    assert asyncio.run(consume()) == ["a", "b", "c"]
+    assert timer_seconds(instrumentation.emit(), "collect") < CONSUMER_SECONDS
+
+
+def row_counters(metrics: CycleMetrics) -> Dict[tuple, float]:
+    return {key: value for key, value in metrics.counters.items() if key[0].startswith("rows_")}
+
+
+def test_async_cycle_counts_the_same_rows(empty_database: None, replay_dir: Path, run_cycle: Callable[[ClientParser], None]) -> None:
+    sink = CapturingSink()
+    client_parser = ClientParser(runner=ReplayRunner(str(replay_dir)), instrumentation=Instrumentation([sink]))
+    try:
+        run_cycle(client_parser)
+        asyncio.run(client_parser._get_data_async(verbose=False))
+        if client_parser._cleanup_thread is not None:
+            client_parser._cleanup_thread.join()
+    finally:
+        client_parser._executor.shutdown(wait=True)
+
+    threaded, asynchronous = sink.cycles
+    assert row_counters(threaded)[("rows_parsed", (("source", "10.0.1.0"),))] == 7
+    assert row_counters(asynchronous) == row_counters(threaded)
+
+    # The command phase and the collect timer of every source are labelled with its server
+    assert ("command", (("server", "dhcp.test.local"), ("source", "10.0.1.0"))) in threaded.timers
+    assert ("collect", (("server", "dns.test.local"), ("source", "test.local"))) in asynchronous.timers
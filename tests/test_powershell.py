@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_powershell.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the PowerShell worker pool from the asyncio engine, with workers
+# that print their script instead of running PowerShell.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import asyncio
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+
+from clientparser.powershell import ASYNC_READ_LINES, PowerShellPool
+
+
+class FakeWorker:
+    """A PowerShell worker that prints the lines of the script instead of running it."""
+
+    def __init__(self, executable: str) -> None:
+        self.alive = True
+        self.closed = False
+
+    @contextmanager
+    def stream(self, script: str) -> Iterator[Iterator[str]]:
+        yield iter(script.splitlines(keepends=True))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch: pytest.MonkeyPatch) -> PowerShellPool:
+    monkeypatch.setattr("clientparser.powershell.PowerShellWorker", FakeWorker)
+    return PowerShellPool(size=1)
+
+
+def test_astream_reuses_the_worker(pool: PowerShellPool) -> None:
+    # More lines than a single read of the worker
+    script = "".join(f"line {number}\n" for number in range(ASYNC_READ_LINES * 2 + 500))
+
+    async def read() -> List[str]:
+        async with pool.astream(script) as lines:
+            return [line async for line in lines]
+
+    assert "".join(asyncio.run(read())) == script
+    # The worker is idle again and reused by the next script
+    assert pool._idle_workers.qsize() == 1
+    assert "".join(asyncio.run(read())) == script
+    assert len(pool._workers) == 1
+
+
+def test_astream_discards_the_worker_of_a_failed_read(pool: PowerShellPool) -> None:
+    async def read() -> None:
+        async with pool.astream("a\nb\n") as lines:
+            async for _ in lines:
+                raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        asyncio.run(read())
+    assert pool._workers == [] and pool._idle_workers.qsize() == 0
+    # The slot of the discarded worker is free
+    assert pool._slots.acquire(blocking=False)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_runners.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the command runners, and a full collection cycle replayed
+# from the captured outputs into a SQLite database.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+import pytest
+from sqlalchemy import select
+
+from clientparser import ClientParser, database
+from clientparser.database import get_dhcp_table, get_final_table, DNSModel
+from clientparser.powershell import PowerShellPool
+from clientparser.process import CommandException
+from clientparser.runners import Command, ReplayRunner, RecordingRunner, SubprocessRunner
+
+DHCP_COMMAND = Command(kind="dhcp", targets=("10.0.1.0",), args=[])
+
+
+def test_replay_runner_serves_the_fixture(fixture_dir: Path) -> None:
+    with ReplayRunner(str(fixture_dir)).stream(DHCP_COMMAND) as lines:
+        assert "".join(lines) == (fixture_dir / "dhcp_10.0.1.0.txt").read_text(encoding="utf-8")
+
+
+def test_replay_runner_without_fixture(fixture_dir: Path) -> None:
+    with pytest.raises(RuntimeError):
+        with ReplayRunner(str(fixture_dir)).stream(Command(kind="dhcp", targets=("10.0.9.0",), args=[])):
+            pass
+
+
+def test_recording_runner_saves_the_output(fixture_dir: Path, tmp_path: Path) -> None:
+    runner = RecordingRunner(ReplayRunner(str(fixture_dir)), str(tmp_path))
+    with runner.stream(DHCP_COMMAND) as lines:
+        output = "".join(lines)
+    assert (tmp_path / "dhcp_10.0.1.0.txt").read_text(encoding="utf-8") == output
+
+
+def test_subprocess_runner_streams_the_output() -> None:
+    command = Command(kind="dhcp", targets=("10.0.1.0",), args=[sys.executable, "-c", "print('a'); print('b')"])
+    with SubprocessRunner().stream(command) as lines:
+        assert [line.strip() for line in lines] == ["a", "b"]
+
+
+def test_subprocess_runner_raises_on_a_failed_command() -> None:
+    # A failed command must not be read as an empty output
+    command = Command(kind="dhcp", targets=("10.0.1.0",), args=[sys.executable, "-c", "import sys; sys.exit('server unavailable')"])
+    with pytest.raises(CommandException, match="server unavailable"):
+        with SubprocessRunner().stream(command) as lines:
+            list(lines)
+
+
+class FakeWorker:
+    """A PowerShell worker that prints the lines of the script instead of running it."""
+
+    def __init__(self, executable: str) -> None:
+        self.alive = True
+
+    @contextmanager
+    def stream(self, script: str) -> Iterator[Iterator[str]]:
+        yield iter(script.splitlines(keepends=True))
+
+    def close(self) -> None:
+        pass
+
+
+def test_subprocess_runner_streams_async_through_the_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("clientparser.powershell.PowerShellWorker", FakeWorker)
+    pool = PowerShellPool(size=1)
+    # The command line would fail, the script runs on the pool
+    command = Command(kind="dns_forward", targets=("test.local",), args=["no-such-powershell"], script="a\nb\n")
+
+    async def read() -> List[str]:
+        async with SubprocessRunner(powershell_pool=pool).astream(command) as lines:
+            return [line async for line in lines]
+
+    assert asyncio.run(read()) == ["a\n", "b\n"]
+    assert len(pool._workers) == 1
+
+
+def test_replayed_cycle(client_parser: ClientParser, run_cycle: Callable[[ClientParser], None]) -> None:
+    run_cycle(client_parser)
+
+    dhcp_table = get_final_table(get_dhcp_table("10.0.1.0"))
+    dns_table = get_final_table(DNSModel.__table__)
+    with database.db_engine.connect() as connection:
+        leases = {row.ip: row for row in connection.execute(select(dhcp_table))}
+        records = {(row.name, row.record_type, row.hostname): row.data for row in connection.execute(select(dns_table))}
+
+    assert len(leases) == 7
+    assert leases["10.0.1.12"].mac_address == "01:00:15:5D:01:02:05:AA:XX"
+    assert records == {
+        ("test.local", "A", "host1"): "10.0.1.10",
+        ("test.local", "CNAME", "www"): "host1.test.local.",
+        ("test.local", "MX", "@"): "mail.test.local.",
+        # The reverse records hold the hostname and the full IP address
+        ("1.0.10.in-addr.arpa", "PTR", "host1"): "10.0.1.10",
+    }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_scheduler.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the scheduler of the interval mode on a fake clock: the aligned
+# deadlines, the skip and catch-up overrun policies, and the collectors that are
+# due on every tick when they run on different intervals.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+import math
+from typing import Callable, Dict, List, Optional
+
+import pytest
+
+from clientparser import ClientParser
+from clientparser.scheduler import Scheduler
+
+# A wall clock time on a day boundary, and on a boundary of every interval
+MIDNIGHT = 86400.0 * 20000
+
+
+class FakeClock:
+    """A monotonic and wall clock that only move when the scheduler sleeps or a job runs."""
+
+    def __init__(self, wall_time: float) -> None:
+        self.monotonic = 1000.0
+        self.offset = wall_time - self.monotonic
+
+    def __call__(self) -> float:
+        return self.monotonic
+
+    def time(self) -> float:
+        return self.monotonic + self.offset
+
+    def advance(self, seconds: float) -> None:
+        self.monotonic += seconds
+
+
+class FakeStopEvent:
+    """A stop event whose wait advances the fake clock instead of sleeping."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.waits: List[float] = []
+        self._set = False
+
+    def set(self) -> None:
+        self._set = True
+
+    def is_set(self) -> bool:
+        return self._set
+
+    def wait(self, timeout: float) -> bool:
+        self.waits.append(timeout)
+        self.clock.advance(timeout)
+        return self._set
+
+
+def create_scheduler(monkeypatch: pytest.MonkeyPatch, interval: float, overrun: str, wall_time: float) -> Scheduler:
+    clock = FakeClock(wall_time)
+    monkeypatch.setattr("clientparser.scheduler.time.time", clock.time)
+    scheduler = Scheduler(interval, overrun=overrun, clock=clock)
+    scheduler._stop = FakeStopEvent(clock)
+    return scheduler
+
+
+def run_jobs(scheduler: Scheduler, durations: List[float], on_skip: Optional[Callable[[int], None]] = None) -> List[float]:
+    """Run jobs of the given durations and return the wall clock boundaries they ran for."""
+    boundaries: List[float] = []
+
+    def job(boundary: float) -> None:
+        boundaries.append(boundary)
+        scheduler.clock.advance(durations[len(boundaries) - 1])
+        if len(boundaries) == len(durations):
+            scheduler.stop()
+
+    scheduler.run(job, on_skip=on_skip)
+    return boundaries
+
+
+def test_first_deadline_is_aligned_to_the_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 300, "skip", MIDNIGHT + 100.5)
+
+    deadline = scheduler.first_deadline()
+
+    assert scheduler.boundary == MIDNIGHT + 300
+    assert deadline == scheduler.clock() + 199.5
+
+
+def test_next_deadline_keeps_the_cadence(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "skip", MIDNIGHT - 30)
+    deadline = scheduler.first_deadline()
+    scheduler.clock.advance(30 + 12.5)
+
+    assert scheduler.next_deadline(deadline) == deadline + 60
+    assert scheduler.boundary == MIDNIGHT + 60
+    assert scheduler.skipped == 0
+
+
+def test_skip_drops_the_missed_deadlines(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "skip", MIDNIGHT - 30)
+    deadline = scheduler.first_deadline()
+
+    # The run took two and a half intervals past its deadline
+    scheduler.clock.advance(30 + 150)
+
+    assert scheduler.next_deadline(deadline) == deadline + 180
+    assert scheduler.boundary == MIDNIGHT + 180
+    assert scheduler.skipped == 2
+
+
+def test_catch_up_keeps_the_missed_deadlines(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "catch-up", MIDNIGHT - 30)
+    deadline = scheduler.first_deadline()
+    scheduler.clock.advance(30 + 150)
+
+    assert scheduler.next_deadline(deadline) == deadline + 60
+    assert scheduler.boundary == MIDNIGHT + 60
+    assert scheduler.skipped == 0
+
+
+def test_skip_policy_runs_on_the_next_boundary(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "skip", MIDNIGHT - 30)
+    skipped: List[int] = []
+
+    boundaries = run_jobs(scheduler, [10, 150, 10, 10], on_skip=skipped.append)
+
+    assert boundaries == [MIDNIGHT, MIDNIGHT + 60, MIDNIGHT + 240, MIDNIGHT + 300]
+    assert skipped == [2]
+    # The waits end on the boundaries, the overrun does not shift the cadence
+    assert scheduler._stop.waits == [30, 50, 30, 50]
+
+
+def test_catch_up_policy_runs_the_missed_boundaries(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "catch-up", MIDNIGHT - 30)
+
+    boundaries = run_jobs(scheduler, [10, 150, 10, 10, 10])
+
+    assert boundaries == [MIDNIGHT, MIDNIGHT + 60, MIDNIGHT + 120, MIDNIGHT + 180, MIDNIGHT + 240]
+    assert scheduler.skipped == 0
+    # The missed boundaries run right away, then the scheduler waits for the next one
+    assert scheduler._stop.waits == [30, 50, 10]
+
+
+@pytest.fixture
+def intervals() -> Dict[str, int]:
+    return {"dhcp": 60, "dns_forward": 300, "dns_reverse": 86400}
+
+
+def run_ticks(client_parser: ClientParser, intervals: Dict[str, int], boundaries: List[float]) -> List[List[str]]:
+    """The due collectors of every boundary, the last runs are kept like the application loop does."""
+    due: List[List[str]] = []
+    for boundary in boundaries:
+        collectors = client_parser._due_collectors(boundary, intervals)
+        client_parser._last_runs.update((collector, boundary) for collector in collectors)
+        due.append(collectors)
+    return due
+
+
+def test_mixed_intervals_tick_on_the_common_interval(intervals: Dict[str, int]) -> None:
+    assert math.gcd(*intervals.values()) == 60
+
+
+def test_due_collectors_of_mixed_intervals(client_parser: ClientParser, intervals: Dict[str, int]) -> None:
+    ticks = [MIDNIGHT - 300 + 60 * tick for tick in range(11)]
+
+    due = run_ticks(client_parser, intervals, ticks)
+
+    assert due[0] == ["dhcp", "dns_forward", "dns_reverse"]
+    assert due[1:5] == [["dhcp"]] * 4
+    assert due[5] == ["dhcp", "dns_forward", "dns_reverse"]
+    assert due[6:10] == [["dhcp"]] * 4
+    assert due[10] == ["dhcp", "dns_forward"]
+
+
+def test_due_collectors_after_skipped_ticks(client_parser: ClientParser, intervals: Dict[str, int]) -> None:
+    # The boundaries in between were skipped, the longer intervals still run in their new period
+    due = run_ticks(client_parser, intervals, [MIDNIGHT - 300, MIDNIGHT - 240, MIDNIGHT + 120, MIDNIGHT + 180])
+
+    assert due == [["dhcp", "dns_forward", "dns_reverse"], ["dhcp"], ["dhcp", "dns_forward", "dns_reverse"], ["dhcp"]]
+
+
+def test_due_collectors_on_the_scheduler(client_parser: ClientParser, intervals: Dict[str, int], monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, math.gcd(*intervals.values()), "skip", MIDNIGHT - 330)
+    runs: List[List[str]] = []
+
+    def job(boundary: float) -> None:
+        runs.extend(run_ticks(client_parser, intervals, [boundary]))
+        if len(runs) == 7:
+            scheduler.stop()
+
+    scheduler.run(job)
+
+    assert runs == [["dhcp", "dns_forward", "dns_reverse"]] + [["dhcp"]] * 4 + [["dhcp", "dns_forward", "dns_reverse"], ["dhcp"]]
+
+
+def test_unknown_overrun_policy() -> None:
+    with pytest.raises(ValueError):
+        Scheduler(60, overrun="run-twice")
+
+
+def test_job_exception_stops_the_scheduler(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "skip", MIDNIGHT - 30)
+
+    def job(boundary: float) -> None:
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        scheduler.run(job)
+
+
+def test_stop_while_waiting(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = create_scheduler(monkeypatch, 60, "skip", MIDNIGHT - 30)
+    scheduler._stop.set()
+
+    def job(boundary: float) -> None:
+        pytest.fail("The job ran after the scheduler was stopped")
+
+    scheduler.run(job)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_sync.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the incremental sync mode: the deltas between the snapshots,
+# the changes applied to the final tables, and an incremental cycle compared with
+# a full cycle of the same outputs.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+from sqlalchemy import Table
+
+from clientparser import ClientParser, database
+from clientparser.database import apply_changes, fetch_rows, get_dhcp_table, get_final_table, DNSModel
+from clientparser.sync import DHCP_KEY, DNS_KEY, build_snapshot, diff_snapshots
+
+FIRST_CYCLE = datetime(2025, 3, 20, 12, 0, 0)
+SECOND_CYCLE = datetime(2025, 3, 20, 12, 5, 0)
+
+
+def lease(ip: str, mac_address: str, hostname: str, timestamp: datetime = FIRST_CYCLE) -> Dict[str, Any]:
+    return {"ip": ip, "mac_address": mac_address, "lease_status": "NEVER EXPIRES", "hostname": hostname, "subnet": "10.0.1.0", "timestamp": timestamp}
+
+
+def record(name: str, hostname: str, data: str, timestamp: datetime = FIRST_CYCLE) -> Dict[str, Any]:
+    return {"name": name, "hostname": hostname, "record_type": "A", "data": data, "timestamp": timestamp}
+
+
+def test_diff_snapshots_inserts_updates_deletes() -> None:
+    previous = build_snapshot([lease("10.0.1.10", "00:00:00:00:00:01", "kept"), lease("10.0.1.11", "00:00:00:00:00:02", "moved"), lease("10.0.1.12", "00:00:00:00:00:03", "gone")], DHCP_KEY)
+    current = build_snapshot([lease("10.0.1.10", "00:00:00:00:00:01", "kept"), lease("10.0.1.21", "00:00:00:00:00:02", "moved"), lease("10.0.1.13", "00:00:00:00:00:04", "new")], DHCP_KEY)
+
+    delta = diff_snapshots(previous, current)
+
+    assert [row["hostname"] for row in delta.inserts] == ["new"]
+    assert [(row["hostname"], row["ip"]) for row in delta.updates] == [("moved", "10.0.1.21")]
+    assert [row["hostname"] for row in delta.deletes] == ["gone"]
+
+
+def test_timestamp_only_change_is_not_an_update() -> None:
+    previous = build_snapshot([lease("10.0.1.10", "00:00:00:00:00:01", "host1", FIRST_CYCLE)], DHCP_KEY)
+    current = build_snapshot([lease("10.0.1.10", "00:00:00:00:00:01", "host1", SECOND_CYCLE)], DHCP_KEY)
+
+    delta = diff_snapshots(previous, current)
+
+    assert not delta
+    assert delta.updates == []
+
+
+@pytest.fixture
+def dns_table(empty_database: None) -> Table:
+    """The final DNS table with the same record in two zones."""
+    database.initialize_and_create_tables(create_tables=False)
+    table = get_final_table(DNSModel.__table__)
+    table.create(bind=database.db_engine)
+    apply_changes(table, [record("a.test", "host1", "10.0.1.10"), record("b.test", "host1", "10.0.1.10"), record("a.test", "host2", "10.0.1.11")], [], [], key_columns=DNS_KEY)
+    return table
+
+
+def test_apply_changes_filters_scope_the_deletes(dns_table: Table) -> None:
+    apply_changes(dns_table, [], [], [record("a.test", "host1", "10.0.1.10")], key_columns=DNS_KEY, filters={"name": "a.test"})
+
+    assert sorted((row["name"], row["hostname"]) for row in fetch_rows(dns_table)) == [("a.test", "host2"), ("b.test", "host1")]
+
+
+def test_apply_changes_filters_scope_the_updates(dns_table: Table) -> None:
+    updated = {**record("b.test", "host1", "10.0.1.10", SECOND_CYCLE)}
+    apply_changes(dns_table, [], [updated], [], key_columns=DNS_KEY, filters={"name": "b.test"})
+
+    timestamps = {(row["name"], row["hostname"]): row["timestamp"] for row in fetch_rows(dns_table)}
+    assert timestamps == {("a.test", "host1"): FIRST_CYCLE, ("b.test", "host1"): SECOND_CYCLE, ("a.test", "host2"): FIRST_CYCLE}
+
+
+def test_apply_changes_inserts_updates_deletes(dns_table: Table) -> None:
+    previous = build_snapshot(fetch_rows(dns_table, {"name": "a.test"}), DNS_KEY)
+    current = build_snapshot([record("a.test", "host2", "10.0.1.11"), record("a.test", "host3", "10.0.1.12", SECOND_CYCLE)], DNS_KEY)
+
+    apply_changes(dns_table, *diff_snapshots(previous, current), key_columns=DNS_KEY, filters={"name": "a.test"})
+
+    assert sorted((row["name"], row["hostname"]) for row in fetch_rows(dns_table)) == [("a.test", "host2"), ("a.test", "host3"), ("b.test", "host1")]
+
+
+def change_outputs(replay_dir: Path) -> None:
+    """Change the captured outputs: a moved, a new and a removed lease, and a removed and a new record."""
+    dhcp_path = replay_dir / "dhcp_10.0.1.0.txt"
+    lines = dhcp_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    lines = [line.replace("10.0.1.11 ", "10.0.1.99 ") for line in lines if not line.startswith("10.0.1.16")]
+    lines.insert(lines.index(next(line for line in lines if line.startswith("10.0.1.15"))) + 1, "10.0.1.17       - 255.255.255.0  - 00-15-5d-01-02-09   - NEVER EXPIRES            -D-  new-host\n")
+    dhcp_path.write_text("".join(lines), encoding="utf-8")
+
+    forward_path = replay_dir / "dns_forward_test.local.txt"
+    lines = [line for line in forward_path.read_text(encoding="utf-8").splitlines(keepends=True) if '"www"' not in line]
+    forward_path.write_text("".join(lines) + '{"Name":"test.local","Hostname":"new-host","Type":"A","Data":"10.0.1.17"}\n', encoding="utf-8")
+
+
+def final_tables() -> List[Table]:
+    return [get_final_table(get_dhcp_table("10.0.1.0")), get_final_table(DNSModel.__table__)]
+
+
+def test_incremental_cycle_matches_full_cycle(client_parser: ClientParser, replay_dir: Path, run_cycle: Callable[[ClientParser], None], table_rows: Callable[[Table], List[Dict[str, Any]]], monkeypatch: pytest.MonkeyPatch, empty_database: None) -> None:
+    # The changed outputs written by a full cycle on an empty database
+    change_outputs(replay_dir)
+    run_cycle(client_parser)
+    expected = [table_rows(table) for table in final_tables()]
+
+    # A full cycle of the captured outputs, then an incremental cycle of the changed outputs
+    for table in final_tables():
+        table.drop(bind=database.db_engine)
+    for path in replay_dir.iterdir():
+        path.write_text((Path(__file__).parent / "fixtures" / path.name).read_text(encoding="utf-8"), encoding="utf-8")
+    run_cycle(client_parser)
+    assert not client_parser._incremental
+    assert [table_rows(table) for table in final_tables()] != expected
+
+    change_outputs(replay_dir)
+    monkeypatch.setattr(client_parser.config, "_sync_mode", "incremental")
+    run_cycle(client_parser)
+    assert client_parser._incremental
+
+    assert [table_rows(table) for table in final_tables()] == expected
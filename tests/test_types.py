@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# ----------------------------------------------------------------------------------
+# Project: ClientParser
+# File: tests/test_types.py
+# ----------------------------------------------------------------------------------
+# Purpose:
+# These tests cover the column types of the compact schema: the addresses of the
+# captured leases are read back as the strings that were written.
+# ----------------------------------------------------------------------------------
+# Author: Christofanis Skordas
+#
+# Copyright (C) 2025 GSECARS, The University of Chicago, USA
+# Copyright (C) 2025 NSF SEES, USA
+# ----------------------------------------------------------------------------------
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Column, Engine, Integer, MetaData, Table, create_engine, select
+
+from clientparser.parsers import parse_leases
+from clientparser.types import IPv4Address, MACAddress
+
+metadata = MetaData()
+addresses = Table(
+    "addresses",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("ip", IPv4Address()),
+    Column("mac_address", MACAddress()),
+)
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    engine = create_engine("sqlite://")
+    metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def round_trip(engine: Engine, ip: str, mac_address: str) -> tuple:
+    with engine.begin() as connection:
+        connection.execute(addresses.delete())
+        connection.execute(addresses.insert(), {"ip": ip, "mac_address": mac_address})
+        return tuple(connection.execute(select(addresses.c.ip, addresses.c.mac_address)).one())
+
+
+@pytest.mark.parametrize("ip", ["0.0.0.0", "10.0.1.13", "192.168.255.1", "255.255.255.255"])
+def test_ipv4_address_round_trip(engine: Engine, ip: str) -> None:
+    assert round_trip(engine, ip, "00:15:5D:01:02:03") == (ip, "00:15:5D:01:02:03")
+
+
+def test_ipv4_address_sorts_like_the_address(engine: Engine) -> None:
+    ips = ["10.0.1.9", "10.0.1.10", "10.0.2.1", "9.255.255.255"]
+    with engine.begin() as connection:
+        connection.execute(addresses.insert(), [{"ip": ip} for ip in ips])
+        assert connection.execute(select(addresses.c.ip).order_by(addresses.c.ip)).scalars().all() == ["9.255.255.255", "10.0.1.9", "10.0.1.10", "10.0.2.1"]
+
+
+@pytest.mark.parametrize("mac_address", [
+    "00:15:5D:01:02:03",
+    "01:00:15:5D:01:02:06:XX",
+    "01:00:15:5D:01:02:06:BB:CC:DD:EE:FF:XX",
+    ":".join(["AB"] * 255) + ":XX",
+])
+def test_mac_address_round_trip(engine: Engine, mac_address: str) -> None:
+    assert round_trip(engine, "10.0.1.10", mac_address) == ("10.0.1.10", mac_address)
+
+
+def test_captured_leases_round_trip(engine: Engine, fixture_dir: Path) -> None:
+    leases = parse_leases((fixture_dir / "dhcp_10.0.1.0.txt").read_text(encoding="utf-8"), "10.0.1.0")
+    assert any(mac_address.endswith(":XX") for _, mac_address, *_ in leases)
+
+    for ip, mac_address, *_ in leases:
+        assert round_trip(engine, ip, mac_address) == (ip, mac_address)
+
+
+def test_invalid_addresses_are_rejected(engine: Engine) -> None:
+    with pytest.raises(Exception, match="Invalid IPv4 address"):
+        round_trip(engine, "10.0.1.300", "00:15:5D:01:02:03")
+    with pytest.raises(Exception, match="Invalid MAC address"):
+        round_trip(engine, "10.0.1.10", "00:15:5D:01:02:0G")